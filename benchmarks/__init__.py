@@ -0,0 +1,13 @@
+"""Offline benchmarks for the DPC integration.
+
+The core of the integration is imported as the top level package core, from
+custom_components/dpc, so the package of the integration (and Home
+Assistant) is never imported.
+"""
+
+import sys
+from pathlib import Path
+
+_INTEGRATION = str(Path(__file__).resolve().parent.parent / "custom_components" / "dpc")
+if _INTEGRATION not in sys.path:
+    sys.path.insert(0, _INTEGRATION)
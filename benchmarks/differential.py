@@ -0,0 +1,434 @@
+"""Differential checks of the point in polygon engines against the reference.
+
+Randomized points near edges, on vertices, inside holes and across
+MultiPolygon parts are resolved by core.geometry.point_in_polygon (and
+_pnpoly) and by every engine registered in benchmarks/engines.py; any
+disagreement is reported with the seed to reproduce it. The bbox prefilter
+_point_in_bbox is checked against the coordinates it is built from, and
+ZoneIndex.nearest and ZoneIndex.within against a scan of every edge of the zones,
+PhenomenaIndex.within (grid buckets) against geometry_within_radius, the
+nearest phenomena of get_phenomena (heap) against a sort of all of them, and
+the phenomena of a bulletin decoded with stream_parse against the whole one.
+linestrings_intersect (sweep) is checked against _linestrings_intersect_naive
+on random walks, zone boundaries and lines sharing vertices and edges, and
+simplify_coords against its tolerance.
+
+    python -m benchmarks.differential [--seed 0] [--points 2000] [--fixtures DIR]
+
+Exits with status 1 when an engine disagrees with the reference.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+from core import DpcApiClient
+from core.geometry import (
+    _bbox_around_polycoords,
+    _linestrings_intersect_naive,
+    _pnpoly,
+    _point_in_bbox,
+    geometry_within_radius,
+    linestrings_intersect,
+    point_distance,
+    point_in_polygon,
+    simplify_coords,
+)
+from core.index import (
+    EARTH_RADIUS,
+    PhenomenaIndex,
+    ZoneIndex,
+    _segment_distance,
+)
+from core.parsers import get_phenomena
+
+from . import fixtures
+from .engines import ENGINES, REFERENCE
+from .geometry import load_zones
+
+
+def polygons(geometry: dict) -> list:
+    """Return the polygons (lists of rings) of a Polygon or MultiPolygon."""
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+def point(lon: float, lat: float) -> dict:
+    return {"type": "Point", "coordinates": [lon, lat]}
+
+
+def near_edge(rnd: random.Random, geometry: dict) -> dict:
+    """Point on an edge, or pushed off it by up to a metre."""
+    ring = rnd.choice(rnd.choice(polygons(geometry)))
+    i = rnd.randrange(len(ring) - 1)
+    (x1, y1), (x2, y2) = ring[i][:2], ring[i + 1][:2]
+    t = rnd.random()
+    offset = rnd.choice([0.0, 1e-12, 1e-9, 1e-5]) * rnd.choice([-1, 1])
+    return point(x1 + (x2 - x1) * t + offset, y1 + (y2 - y1) * t - offset)
+
+
+def on_vertex(rnd: random.Random, geometry: dict) -> dict:
+    ring = rnd.choice(rnd.choice(polygons(geometry)))
+    lon, lat = rnd.choice(ring)[:2]
+    return point(lon, lat)
+
+
+def in_hole(rnd: random.Random, geometry: dict) -> dict:
+    """Point in the bbox of a hole, or anywhere in the bbox if there are none."""
+    rings = [ring for polygon in polygons(geometry) for ring in polygon[1:]]
+    ring = rnd.choice(rings) if rings else rnd.choice(polygons(geometry))[0]
+    lons = [coord[0] for coord in ring]
+    lats = [coord[1] for coord in ring]
+    return point(rnd.uniform(min(lons), max(lons)), rnd.uniform(min(lats), max(lats)))
+
+
+def across_parts(rnd: random.Random, geometry: dict) -> dict:
+    """Point anywhere in the bbox spanning all the parts."""
+    coords = [coord for polygon in polygons(geometry) for coord in polygon[0]]
+    lons = [coord[0] for coord in coords]
+    lats = [coord[1] for coord in coords]
+    return point(rnd.uniform(min(lons), max(lons)), rnd.uniform(min(lats), max(lats)))
+
+
+GENERATORS = {
+    "near_edge": near_edge,
+    "on_vertex": on_vertex,
+    "in_hole": in_hole,
+    "across_parts": across_parts,
+}
+
+
+def geometries(zones: list) -> list:
+    """Return the zones plus stress geometries with holes and many parts."""
+    holed = fixtures.holed_polygon(12.0, 42.0, 50)
+    star = fixtures.star_polygon(12.0, 42.0, 2000)
+    multi = {
+        "type": "MultiPolygon",
+        "coordinates": [holed["coordinates"], star["coordinates"]]
+        + [fixtures.holed_polygon(15.0 + i, 40.0, 4, 0.5)["coordinates"] for i in range(3)],
+    }
+    return zones + [holed, star, multi]
+
+
+def check_bbox(rnd: random.Random, geometry: dict, sample: dict) -> list:
+    """Check _point_in_bbox and that the prefilter never drops a contained point."""
+    errors = []
+    lon, lat = sample["coordinates"]
+    in_any_bbox = False
+    for polygon in polygons(geometry):
+        bounds = _bbox_around_polycoords(polygon)
+        lons = [coord[0] for coord in polygon[0]]
+        lats = [coord[1] for coord in polygon[0]]
+        expected = min(lons) <= lon <= max(lons) and min(lats) <= lat <= max(lats)
+        if _point_in_bbox(sample, bounds) != expected:
+            errors.append(("_point_in_bbox", sample, expected))
+        in_any_bbox = in_any_bbox or expected
+        corner = point(rnd.choice([min(lons), max(lons)]), rnd.choice([min(lats), max(lats)]))
+        if not _point_in_bbox(corner, bounds):
+            errors.append(("_point_in_bbox corner", corner, True))
+    if point_in_polygon(sample, geometry) and not in_any_bbox:
+        errors.append(("bbox prefilter", sample, False))
+    return errors
+
+
+def brute_nearest(sample: dict, zones: list) -> float:
+    """Return the distance (m) of the nearest edge of the zones, on the tangent plane."""
+    lon, lat = sample["coordinates"]
+    ky = EARTH_RADIUS * math.pi / 180
+    kx = ky * math.cos(math.radians(lat))
+    best = math.inf
+    for geometry in zones:
+        for polygon in polygons(geometry):
+            for ring in polygon:
+                for (x1, y1), (x2, y2) in zip(ring[-1:] + ring[:-1], ring):
+                    best = min(
+                        best,
+                        _segment_distance(
+                            (x1 - lon) * kx, (y1 - lat) * ky, (x2 - lon) * kx, (y2 - lat) * ky
+                        ),
+                    )
+    return best
+
+
+def check_nearest(rnd: random.Random, zones: list, count: int) -> list:
+    """Check ZoneIndex.nearest and within against brute_nearest, near and far the zones."""
+    errors = []
+    index = ZoneIndex({"features": [{"geometry": g, "properties": {}} for g in zones]})
+    for _ in range(count):
+        if rnd.random() < 0.5:
+            sample = near_edge(rnd, rnd.choice(zones))
+        else:
+            sample = point(rnd.uniform(0.0, 25.0), rnd.uniform(30.0, 52.0))
+        position, distance = index.nearest(sample)
+        expected = brute_nearest(sample, zones)
+        if not math.isclose(distance, expected, rel_tol=1e-9, abs_tol=1e-6):
+            errors.append(("nearest", sample, expected, distance))
+        elif position is None or position >= len(zones):
+            errors.append(("nearest index", sample, expected, position))
+
+        radius = rnd.choice([1000, 20000, 80000])
+        expected = [
+            i
+            for i, geometry in enumerate(zones)
+            if point_in_polygon(sample, geometry) or brute_nearest(sample, [geometry]) <= radius
+        ]
+        if index.within(sample, radius) != expected:
+            errors.append(("within", sample, radius, expected))
+    return errors
+
+
+def random_line(rnd: random.Random, zones: list) -> dict:
+    """Return a random walk, a zone boundary or a piece of one."""
+    kind = rnd.choice(["walk", "ring", "piece"])
+    if kind == "walk":
+        lon, lat = rnd.uniform(8.0, 16.0), rnd.uniform(38.0, 46.0)
+        coords = []
+        for _ in range(rnd.randint(2, 300)):
+            lon += rnd.uniform(-0.2, 0.2)
+            lat += rnd.uniform(-0.2, 0.2)
+            coords.append([lon, lat])
+        return {"type": "LineString", "coordinates": coords}
+    ring = rnd.choice(rnd.choice(polygons(rnd.choice(zones))))
+    if kind == "piece":
+        start = rnd.randrange(len(ring) - 1)
+        ring = ring[start : start + rnd.randint(2, 200)]
+    return {"type": "LineString", "coordinates": [list(coord[:2]) for coord in ring]}
+
+
+def check_intersections(rnd: random.Random, zones: list, count: int) -> list:
+    """Check linestrings_intersect against _linestrings_intersect_naive."""
+    errors = []
+    for _ in range(count):
+        line1 = random_line(rnd, zones)
+        # Same line, lines sharing a piece, or independent lines
+        line2 = rnd.choice([line1, random_line(rnd, zones), random_line(rnd, zones)])
+        if rnd.random() < 0.2:
+            line2 = {"type": "LineString", "coordinates": line1["coordinates"][::-1]}
+        expected = _linestrings_intersect_naive(line1, line2)
+        if linestrings_intersect(line1, line2) != expected:
+            errors.append(("linestrings_intersect", len(expected)))
+    return errors
+
+
+def polyline_distance(coord: list, line: list) -> float:
+    """Return the distance (m) of coord from the open polyline, on the tangent plane."""
+    lon, lat = coord[:2]
+    ky = EARTH_RADIUS * math.pi / 180
+    kx = ky * math.cos(math.radians(lat))
+    if len(line) == 1:
+        return math.hypot((line[0][0] - lon) * kx, (line[0][1] - lat) * ky)
+    return min(
+        _segment_distance((x1 - lon) * kx, (y1 - lat) * ky, (x2 - lon) * kx, (y2 - lat) * ky)
+        for (x1, y1), (x2, y2) in zip(line[:-1], line[1:])
+    )
+
+
+def check_simplify(rnd: random.Random, zones: list, count: int) -> list:
+    """Check that no coordinate removed by simplify_coords is farther than the tolerance."""
+    errors = []
+    for _ in range(count):
+        coords = random_line(rnd, zones)["coordinates"]
+        tolerance = rnd.choice([1.0, 50.0, 500.0, 5000.0])
+        simplified = simplify_coords(coords, tolerance)
+        if simplified[0] != coords[0] or simplified[-1] != coords[-1]:
+            errors.append(("simplify_coords ends", len(coords), tolerance))
+        for coord in coords:
+            # Tangent plane and flat scaling differ by far less than 0.1%
+            distance = polyline_distance(coord, simplified)
+            if distance > tolerance * 1.001:
+                errors.append(("simplify_coords", coord, tolerance, distance))
+                break
+    return errors
+
+
+def on_circle(rnd: random.Random, center: dict, radius: float, count: int = 20) -> list:
+    """Return points on the circle of radius (m), or just inside or outside it."""
+    lon, lat = map(math.radians, center["coordinates"])
+    points = []
+    for _ in range(count):
+        bearing = rnd.uniform(0, 2 * math.pi)
+        angle = radius / EARTH_RADIUS * rnd.choice([1 - 1e-12, 1.0, 1 + 1e-12])
+        lat2 = math.asin(
+            math.sin(lat) * math.cos(angle) + math.cos(lat) * math.sin(angle) * math.cos(bearing)
+        )
+        lon2 = lon + math.atan2(
+            math.sin(bearing) * math.sin(angle) * math.cos(lat),
+            math.cos(angle) - math.sin(lat) * math.sin(lat2),
+        )
+        points.append(point((math.degrees(lon2) + 180) % 360 - 180, math.degrees(lat2)))
+    return points
+
+
+def check_phenomena(rnd: random.Random, count: int) -> list:
+    """Check PhenomenaIndex.within against geometry_within_radius over every feature.
+
+    Besides the points of a bulletin, phenomena are put on the circle of the
+    query and near the poles and the antimeridian, where the cells are widest.
+    """
+    errors = []
+    features = fixtures.phenomena("20240101", 500, rnd.randrange(1 << 30))["features"]
+    centers = [point(rnd.uniform(5.0, 20.0), rnd.uniform(35.0, 48.0)) for _ in range(count)]
+    centers += [point(rnd.uniform(-180.0, 180.0), rnd.choice([-89.9, 89.9, 0.0])) for _ in range(5)]
+    for center in centers:
+        radius = rnd.choice([1000, 50000, 200000, 3000000])
+        lon, lat = center["coordinates"]
+        extra = [{"geometry": g, "properties": {}} for g in on_circle(rnd, center, radius)]
+        # A LineString around the center, inside the circle or not
+        line = [[lon + rnd.uniform(-0.3, 0.3), lat + rnd.uniform(-0.3, 0.3)] for _ in range(3)]
+        extra.append({"geometry": {"type": "LineString", "coordinates": line}, "properties": {}})
+        geojs = {"features": features + extra}
+        expected = [
+            i
+            for i, feature in enumerate(geojs["features"])
+            if geometry_within_radius(feature["geometry"], center, radius)
+        ]
+        if PhenomenaIndex(geojs).within(center, radius) != expected:
+            errors.append(("PhenomenaIndex.within", center, radius, len(expected)))
+        errors.extend(check_nearest_phenomena(rnd, features, center, radius / 1000))
+    return errors
+
+
+def check_nearest_phenomena(
+    rnd: random.Random, features: list, center: dict, radius: float
+) -> list:
+    """Check the limit and dedup of get_phenomena against a sort of all the phenomena."""
+    geojs = {"features": features}
+    every = get_phenomena(geojs, center, radius)
+
+    def distance(phenomenon):
+        return point_distance(center, point(phenomenon["longitude"], phenomenon["latitude"]))
+
+    # A stable sort keeps the bulletin order of the phenomena at the same distance
+    ordered = sorted(every, key=distance)
+    limit = rnd.choice([1, 3, 10, 1000])
+    deduped = [
+        p
+        for i, p in enumerate(ordered)
+        if p["id_event"] not in {q["id_event"] for q in ordered[:i]}
+    ]
+    errors = []
+    if get_phenomena(geojs, center, radius, PhenomenaIndex(geojs), limit) != ordered[:limit]:
+        errors.append(("get_phenomena limit", center, radius, limit))
+    if get_phenomena(geojs, center, radius, None, limit, True) != deduped[:limit]:
+        errors.append(("get_phenomena dedup", center, radius, limit))
+    return errors
+
+
+def phenomenon(rnd: random.Random, features: list, geometry: dict) -> dict:
+    """Return a copy of a phenomenon of features moved to the first position of geometry."""
+    position = geometry["coordinates"]
+    if geometry["type"] != "Point":
+        position = position[0]
+    prop = dict(rnd.choice(features)["properties"], lon=position[0], lat=position[1])
+    return {"type": "Feature", "properties": prop, "geometry": geometry}
+
+
+def check_streamed_phenomena(rnd: random.Random, count: int) -> list:
+    """Check the phenomena of a bulletin decoded with stream_parse against the whole one.
+
+    The centers are in the bulletin and near the poles and the antimeridian,
+    with phenomena on the circle, on the other side of ±180 included.
+    """
+    errors = []
+    url = "https://example.org/geojson/20240101_1200_fenomeni.json"
+    features = fixtures.phenomena("20240101", 200, rnd.randrange(1 << 30))["features"]
+    centers = [point(rnd.uniform(5.0, 20.0), rnd.uniform(35.0, 48.0)) for _ in range(count)]
+    centers += [point(rnd.uniform(-180.0, 180.0), rnd.choice([-89.9, 89.9])) for _ in range(5)]
+    centers += [
+        point(rnd.choice([-1, 1]) * rnd.uniform(178.0, 180.0), rnd.uniform(-70.0, 70.0))
+        for _ in range(10)
+    ]
+    for center in centers:
+        radius = rnd.choice([5, 50, 300])
+        lon, lat = center["coordinates"]
+        line = [[lon + rnd.uniform(-0.3, 0.3), lat + rnd.uniform(-0.3, 0.3)] for _ in range(3)]
+        geometries = on_circle(rnd, center, radius * 1000)
+        geometries.append({"type": "LineString", "coordinates": line})
+        extra = [phenomenon(rnd, features, geometry) for geometry in geometries]
+        data = json.dumps({"type": "FeatureCollection", "features": features + extra}).encode()
+        found = []
+        for stream_parse in (False, True):
+            client = DpcApiClient(
+                "differential", lat, lon, "", radius, None, timedelta(0), stream_parse=stream_parse
+            )
+            geojs = client.load_bulletin(url, data)
+            found.append(client.get_phenomena(center, geojs, PhenomenaIndex(geojs)))
+        if found[0] != found[1]:
+            errors.append(("stream_parse phenomena", center, radius, len(found[0])))
+    return errors
+
+
+def check(seed: int, count: int, zones: list) -> dict:
+    """Return the mismatches of every engine, by engine and generator."""
+    rnd = random.Random(seed)
+    shapes = geometries(zones)
+    engines = {name: engine for name, engine in ENGINES.items() if name != REFERENCE}
+    mismatches = {name: [] for name in engines}
+    mismatches["_pnpoly"] = []
+    mismatches["_point_in_bbox"] = []
+    checked = {name: 0 for name in GENERATORS}
+
+    for _ in range(count):
+        kind = rnd.choice(list(GENERATORS))
+        geometry = rnd.choice(shapes)
+        sample = GENERATORS[kind](rnd, geometry)
+        checked[kind] += 1
+        expected = point_in_polygon(sample, geometry)
+
+        lon, lat = sample["coordinates"]
+        pnpoly = any(_pnpoly(lat, lon, polygon) for polygon in polygons(geometry))
+        if pnpoly != expected:
+            mismatches["_pnpoly"].append((kind, sample, expected))
+
+        for name, engine in engines.items():
+            if engine(sample, geometry) != expected:
+                mismatches[name].append((kind, sample, expected))
+
+        mismatches["_point_in_bbox"].extend(check_bbox(rnd, geometry, sample))
+
+    # Zone resolution: every engine must return the same first matching zone.
+    for _ in range(count // 10):
+        sample = across_parts(rnd, rnd.choice(zones))
+        expected = next((i for i, g in enumerate(zones) if point_in_polygon(sample, g)), None)
+        for name, engine in engines.items():
+            found = next((i for i, g in enumerate(zones) if engine(sample, g)), None)
+            if found != expected:
+                mismatches[name].append(("zone", sample, expected))
+
+    mismatches["ZoneIndex.nearest/within"] = check_nearest(rnd, zones, count // 20)
+    mismatches["linestrings_intersect"] = check_intersections(rnd, zones, count // 20)
+    mismatches["simplify_coords"] = check_simplify(rnd, zones, count // 20)
+    mismatches["PhenomenaIndex.within"] = check_phenomena(rnd, count // 20)
+    mismatches["stream_parse phenomena"] = check_streamed_phenomena(rnd, count // 40)
+    return {"checked": checked, "mismatches": mismatches}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Differential checks of the geometry engines.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--fixtures", type=Path, help="mirror with a criticality bulletin")
+    args = parser.parse_args()
+
+    result = check(args.seed, args.points, load_zones(args.fixtures))
+    print("checked: " + ", ".join(f"{k}={v}" for k, v in result["checked"].items()))
+    failed = False
+    for name, errors in result["mismatches"].items():
+        print(f"{name}: {len(errors)} mismatches")
+        for error in errors[:10]:
+            print(f"    {error}")
+        failed = failed or bool(errors)
+    if failed:
+        print(f"Reproduce with --seed {args.seed} --points {args.points}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
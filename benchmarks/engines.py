@@ -0,0 +1,30 @@
+"""Point in polygon engines compared by the benchmarks.
+
+Every engine is a callable (point, geometry) -> bool with the semantics of
+core.geometry.point_in_polygon, the reference engine. Faster engines are
+registered here so the microbenchmarks and the differential checks pick them up.
+"""
+
+from __future__ import annotations
+
+from core.geometry import point_in_polygon
+from core.index import ZoneIndex
+
+REFERENCE = "reference"
+
+_PREPARED: dict[int, tuple[dict, ZoneIndex]] = {}
+
+
+def zone_index(point: dict, geometry: dict) -> bool:
+    """point_in_polygon through a ZoneIndex, prepared once per geometry."""
+    prepared = _PREPARED.get(id(geometry))
+    if prepared is None or prepared[0] is not geometry:
+        index = ZoneIndex({"features": [{"geometry": geometry}]})
+        prepared = _PREPARED[id(geometry)] = (geometry, index)
+    return prepared[1].contains(0, point)
+
+
+ENGINES = {
+    REFERENCE: point_in_polygon,
+    "zone_index": zone_index,
+}
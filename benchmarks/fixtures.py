@@ -0,0 +1,288 @@
+"""Deterministic DPC bulletin fixtures.
+
+The fixtures are laid out as a mirror of the upstream urls
+(``<host>/<path>``, the same tree created by ``wget -x``), so recorded
+bulletins can be dropped in place of the generated ones.
+
+    python -m benchmarks.fixtures OUTPUT_DIR [--rows 12] [--cols 12] [--vertices 60]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+from datetime import date
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Same templates of custom_components/dpc/core/const.py, duplicated to keep
+# the generator standalone.
+CRIT_BULLETIN_URL = (
+    "https://mappe.protezionecivile.gov.it/it/mappe-rischi/bollettino-di-criticita/"
+)
+CRIT_PATTERN_URL = (
+    "https://raw.githubusercontent.com/pcm-dpc/DPC-Bollettini-Criticita-"
+    "Idrogeologica-Idraulica/master/files/geojson/{}_{}.json"
+)
+VIGI_BULLETIN_URL = (
+    "https://mappe.protezionecivile.gov.it/it/mappe-rischi/bollettino-di-vigilanza/"
+)
+VIGI_PATTERN_URL = (
+    "https://raw.githubusercontent.com/pcm-dpc/DPC-Bollettini-Vigilanza-"
+    "Meteorologica/master/files/geojson/{}_{}.json"
+)
+
+CRIT_DAYS = ["today", "tomorrow"]
+VIGI_DAYS = ["oggi", "domani", "dopodomani"]
+
+# Bounding box of Italy (lon, lat)
+LON_MIN, LON_MAX = 6.6, 18.5
+LAT_MIN, LAT_MAX = 36.6, 47.1
+
+CRIT_INFO = {
+    1: "Assenza di fenomeni significativi prevedibili / NESSUNA ALLERTA",
+    2: "Ordinaria per rischio {} / ALLERTA GIALLA",
+    3: "Moderata per rischio {} / ALLERTA ARANCIONE",
+    4: "Elevata per rischio {} / ALLERTA ROSSA",
+}
+RISKS = ["idraulico", "temporali", "idrogeologico"]
+PHENOMENA_IDS = [1, 2, 3, 4, 5, 6, 7, 10, 11, 12, 13, 20, 21, 30, 31, 40, 41, 42, 50, 51]
+LEVEL_WEIGHTS = [70, 18, 9, 3]
+
+
+def url_to_path(root: Path, url: str) -> Path:
+    """Return the mirror path of an upstream url."""
+    parts = urlsplit(url)
+    path = parts.path
+    if path.endswith("/"):
+        path += "index.html"
+    return root / parts.netloc / path.lstrip("/")
+
+
+def default_ids(day: date | None = None) -> tuple[str, str]:
+    """Return a criticality and vigilance id published on day."""
+    day = day or date.today()
+    return f"{day:%Y%m%d}_1500", f"{day:%Y%m%d}"
+
+
+def _edge(p: tuple, q: tuple, vertices: int, amplitude: float) -> list:
+    """Jagged edge from p to q, identical (reversed) when built from q to p."""
+    if q < p:
+        return _edge(q, p, vertices, amplitude)[::-1]
+    rnd = random.Random(f"{p}{q}")
+    dx, dy = q[0] - p[0], q[1] - p[1]
+    length = math.hypot(dx, dy)
+    nx, ny = -dy / length, dx / length
+    points = [[p[0], p[1]]]
+    offset = 0.0
+    for i in range(1, vertices):
+        t = i / vertices
+        taper = math.sin(math.pi * t)
+        offset = max(-1.0, min(1.0, offset + rnd.uniform(-0.3, 0.3)))
+        shift = offset * amplitude * taper
+        points.append([p[0] + dx * t + nx * shift, p[1] + dy * t + ny * shift])
+    points.append([q[0], q[1]])
+    return points
+
+
+def _ring(corners: list, vertices: int, amplitude: float) -> list:
+    ring = []
+    for p, q in zip(corners, corners[1:] + corners[:1]):
+        ring.extend(_edge(p, q, vertices, amplitude)[:-1])
+    ring.append(list(ring[0]))
+    return ring
+
+
+def _square(lon: float, lat: float, size: float) -> list:
+    return [
+        [lon, lat],
+        [lon + size, lat],
+        [lon + size, lat + size],
+        [lon, lat + size],
+        [lon, lat],
+    ]
+
+
+def zones(rows: int = 12, cols: int = 12, vertices: int = 60, seed: int = 0) -> list:
+    """Return the zones as (name, municipalities, geometry) tuples.
+
+    Zones tile the bounding box of Italy; some of them have a hole and some
+    are MultiPolygons with an island outside the tiling, so the fixtures
+    also contain points that fall in no zone.
+    """
+    rnd = random.Random(seed)
+    step_lon = (LON_MAX - LON_MIN) / cols
+    step_lat = (LAT_MAX - LAT_MIN) / rows
+    amplitude = min(step_lon, step_lat) * 0.08
+
+    def corner(r, c):
+        return (round(LON_MIN + c * step_lon, 6), round(LAT_MIN + r * step_lat, 6))
+
+    result = []
+    for r in range(rows):
+        for c in range(cols):
+            index = r * cols + c
+            corners = [corner(r, c), corner(r, c + 1), corner(r + 1, c + 1), corner(r + 1, c)]
+            polygon = [_ring(corners, vertices, amplitude)]
+            if index % 7 == 3:
+                lon, lat = corner(r, c)
+                size = min(step_lon, step_lat) * 0.2
+                polygon.append(_square(lon + step_lon * 0.4, lat + step_lat * 0.4, size))
+            geometry = {"type": "Polygon", "coordinates": polygon}
+            if index % 11 == 5:
+                lon = LON_MAX + 0.5 + rnd.random()
+                lat = LAT_MIN + rnd.random() * (LAT_MAX - LAT_MIN)
+                island = [_square(lon, lat, 0.1)]
+                geometry = {"type": "MultiPolygon", "coordinates": [polygon, island]}
+            municipalities = [f"Comune {r:02d}-{c:02d}-{i:02d}" for i in range(40)]
+            if c + 1 < cols:
+                # Municipality shared with the zone on the right
+                municipalities.append(f"Comune {r:02d}-{c + 1:02d}-00")
+            result.append((f"Zona {r:02d}-{c:02d}", municipalities, geometry))
+    return result
+
+
+def star_polygon(lon: float, lat: float, vertices: int, radius: float = 1.0) -> dict:
+    """Return a star shaped Polygon with many vertices."""
+    ring = []
+    for i in range(vertices):
+        angle = 2 * math.pi * i / vertices
+        r = radius * (1.0 if i % 2 else 0.6)
+        ring.append([lon + r * math.cos(angle), lat + r * math.sin(angle)])
+    ring.append(list(ring[0]))
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+def holed_polygon(lon: float, lat: float, holes: int, size: float = 2.0) -> dict:
+    """Return a square Polygon with a grid of square holes (many rings)."""
+    side = math.ceil(math.sqrt(holes))
+    cell = size / side
+    polygon = [_square(lon, lat, size)]
+    for i in range(holes):
+        row, col = divmod(i, side)
+        polygon.append(_square(lon + col * cell + cell / 4, lat + row * cell + cell / 4, cell / 2))
+    return {"type": "Polygon", "coordinates": polygon}
+
+
+def _level(rnd: random.Random) -> int:
+    return rnd.choices([1, 2, 3, 4], LEVEL_WEIGHTS)[0]
+
+
+def criticality(zone_list: list, seed: int) -> dict:
+    """Return a criticality FeatureCollection."""
+    rnd = random.Random(seed)
+    features = []
+    for name, municipalities, geometry in zone_list:
+        prop = {"Nome zona": name, "Comuni": municipalities}
+        levels = {risk: _level(rnd) for risk in RISKS}
+        for risk, level in levels.items():
+            prop[f"Per rischio {risk}"] = CRIT_INFO[level].format(risk)
+        risk, level = max(levels.items(), key=lambda i: i[1])
+        prop["Rappresentata nella mappa"] = CRIT_INFO[level].format(risk)
+        features.append({"type": "Feature", "properties": prop, "geometry": geometry})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def vigilance(zone_list: list, seed: int) -> dict:
+    """Return a vigilance FeatureCollection."""
+    rnd = random.Random(seed)
+    features = []
+    for name, municipalities, geometry in zone_list:
+        prop = {
+            "Nome_Zona": name,
+            "comuni": municipalities,
+            "id_classificazione": _level(rnd),
+            "Quantitativi_previsti": "Assenti o non rilevanti",
+        }
+        features.append({"type": "Feature", "properties": prop, "geometry": geometry})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def phenomena(id_vigi: str, count: int, seed: int) -> dict:
+    """Return a phenomena FeatureCollection."""
+    rnd = random.Random(seed)
+    features = []
+    for _ in range(count):
+        lon = round(rnd.uniform(LON_MIN, LON_MAX), 4)
+        lat = round(rnd.uniform(LAT_MIN, LAT_MAX), 4)
+        prop = {
+            "id_bollettino": id_vigi,
+            "data_bollettino": f"{id_vigi[:4]}-{id_vigi[4:6]}-{id_vigi[6:8]}",
+            "id_fenomeno": rnd.choice(PHENOMENA_IDS),
+            "lat": lat,
+            "lon": lon,
+        }
+        geometry = {"type": "Point", "coordinates": [lon, lat]}
+        features.append({"type": "Feature", "properties": prop, "geometry": geometry})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def site_page(bulletin_id: str) -> str:
+    """Return a bulletin page where the scraper finds bulletin_id."""
+    return (
+        "<!DOCTYPE html><html><head><title>Bollettino</title></head><body>"
+        f'<div class="bulletin" data-file="{bulletin_id}.json">'
+        f"Bollettino {bulletin_id}</div></body></html>"
+    )
+
+
+def generate(
+    root: Path,
+    id_crit: str | None = None,
+    id_vigi: str | None = None,
+    rows: int = 12,
+    cols: int = 12,
+    vertices: int = 60,
+    phenomena_count: int = 400,
+) -> Path:
+    """Write a full set of fixtures under root and return it."""
+    root = Path(root)
+    default_crit, default_vigi = default_ids()
+    id_crit = id_crit or default_crit
+    id_vigi = id_vigi or default_vigi
+    zone_list = zones(rows, cols, vertices)
+
+    files = {
+        CRIT_BULLETIN_URL: site_page(id_crit),
+        VIGI_BULLETIN_URL: site_page(id_vigi),
+    }
+    for seed, day in enumerate(CRIT_DAYS):
+        files[CRIT_PATTERN_URL.format(id_crit, day)] = criticality(zone_list, seed)
+    for seed, day in enumerate(VIGI_DAYS):
+        files[VIGI_PATTERN_URL.format(id_vigi, day)] = vigilance(zone_list, seed)
+        files[VIGI_PATTERN_URL.format(id_vigi, f"fenomeni_{day}")] = phenomena(
+            id_vigi, phenomena_count, seed
+        )
+
+    for url, content in files.items():
+        path = url_to_path(root, url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, str):
+            path.write_text(content, encoding="utf-8")
+        else:
+            path.write_text(json.dumps(content, separators=(",", ":")), encoding="utf-8")
+    return root
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate DPC bulletin fixtures.")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--rows", type=int, default=12)
+    parser.add_argument("--cols", type=int, default=12)
+    parser.add_argument("--vertices", type=int, default=60, help="vertices per zone edge")
+    parser.add_argument("--phenomena", type=int, default=400)
+    args = parser.parse_args()
+    generate(
+        args.output,
+        rows=args.rows,
+        cols=args.cols,
+        vertices=args.vertices,
+        phenomena_count=args.phenomena,
+    )
+    print(f"Fixtures written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
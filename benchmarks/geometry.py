@@ -0,0 +1,267 @@
+"""Microbenchmarks of the core.geometry primitives on the refresh hot path.
+
+Runs point_in_polygon (every registered engine), _pnpoly,
+geometry_within_radius, point_distance, calculate_initial_compass_bearing,
+ZoneIndex.nearest, PhenomenaIndex.within (grid buckets and a scan),
+linestrings_intersect (sweep and naive) and simplify_coords
+over DPC zone geometries and synthetic stress polygons.
+
+    python -m benchmarks.geometry [--fixtures DIR] [--json] [--save-baseline]
+
+Each case reports the time per call and a digest of its results. The run is
+compared with benchmarks/baseline_geometry.json: a different digest means an
+engine is not equivalent to the reference, a ratio below 1 means it is faster.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from core.geometry import (
+    _linestrings_intersect_naive,
+    _pnpoly,
+    calculate_initial_compass_bearing,
+    geometry_within_radius,
+    linestrings_intersect,
+    point_distance,
+    simplify_coords,
+)
+
+from core.index import PhenomenaIndex, ZoneIndex
+
+from . import fixtures
+from .engines import ENGINES
+
+BASELINE = Path(__file__).with_name("baseline_geometry.json")
+STRESS_VERTICES = 12000
+STRESS_RINGS = 400
+SEED = 1
+SIMPLIFY = 1000  # m
+
+
+def load_zones(root: Path | None) -> list:
+    """Return the zone geometries of a criticality bulletin."""
+    if root:
+        for path in sorted(Path(root).rglob("*.json")):
+            if "Criticita" in path.as_posix() and "fenomeni" not in path.name:
+                geojs = json.loads(path.read_text(encoding="utf-8"))
+                return [feature["geometry"] for feature in geojs["features"]]
+    return [geometry for _, _, geometry in fixtures.zones()]
+
+
+def random_points(count: int, bbox: tuple, seed: int = SEED) -> list:
+    """Return GeoJSON points inside bbox (lon_min, lat_min, lon_max, lat_max)."""
+    rnd = random.Random(seed)
+    return [
+        {
+            "type": "Point",
+            "coordinates": [rnd.uniform(bbox[0], bbox[2]), rnd.uniform(bbox[1], bbox[3])],
+        }
+        for _ in range(count)
+    ]
+
+
+def digest(results: list) -> str:
+    """Return a short digest of the results, rounding floats to the micrometre."""
+    normalized = [round(r, 6) if isinstance(r, float) else r for r in results]
+    return hashlib.sha1(json.dumps(normalized).encode()).hexdigest()[:12]
+
+
+def measure(func, args: list, min_time: float = 0.2) -> tuple[float, list]:
+    """Return the best time per call in microseconds and the results."""
+    results = [func(*arg) for arg in args]
+    best = float("inf")
+    elapsed = 0.0
+    while elapsed < min_time or best == float("inf"):
+        start = time.perf_counter()
+        for arg in args:
+            func(*arg)
+        run = time.perf_counter() - start
+        elapsed += run
+        best = min(best, run / len(args))
+    return best * 1e6, results
+
+
+def zone_lookup(engine):
+    """Return a lookup of the first zone containing a point, as in get_properties."""
+
+    def lookup(point, geometries):
+        for index, geometry in enumerate(geometries):
+            if engine(point, geometry):
+                return index
+        return None
+
+    return lookup
+
+
+def boundaries(vertices: int) -> tuple:
+    """Return the outer rings of two adjacent zones as LineStrings."""
+    return tuple(
+        {"type": "LineString", "coordinates": geometry["coordinates"][0]}
+        for _, _, geometry in fixtures.zones(1, 2, vertices)
+    )
+
+
+def cases(zones: list) -> dict:
+    """Return the benchmark cases as name -> (func, args)."""
+    italy = (fixtures.LON_MIN, fixtures.LAT_MIN, fixtures.LON_MAX, fixtures.LAT_MAX)
+    zone_points = random_points(300, italy)
+    star = fixtures.star_polygon(12.0, 42.0, STRESS_VERTICES)
+    star_points = random_points(300, (11.0, 41.0, 13.0, 43.0))
+    holed = fixtures.holed_polygon(12.0, 42.0, STRESS_RINGS)
+    holed_points = random_points(300, (12.0, 42.0, 14.0, 44.0))
+    center = {"type": "Point", "coordinates": [12.5, 41.9]}
+    phenomena = [
+        feature["geometry"] for feature in fixtures.phenomena("20240101", 2000, SEED)["features"]
+    ]
+    pairs = [
+        ((p["coordinates"][1], p["coordinates"][0]), (q["coordinates"][1], q["coordinates"][0]))
+        for p, q in zip(zone_points, reversed(zone_points))
+    ]
+
+    result = {}
+    for name, engine in ENGINES.items():
+        result[f"zone_lookup[{name}]"] = (
+            zone_lookup(engine),
+            [(point, zones) for point in zone_points],
+        )
+        result[f"point_in_polygon_vertices[{name}]"] = (
+            engine,
+            [(point, star) for point in star_points],
+        )
+        result[f"point_in_polygon_rings[{name}]"] = (
+            engine,
+            [(point, holed) for point in holed_points],
+        )
+    result["_pnpoly_vertices"] = (
+        _pnpoly,
+        [(p["coordinates"][1], p["coordinates"][0], star["coordinates"]) for p in star_points],
+    )
+    result["_pnpoly_rings"] = (
+        _pnpoly,
+        [(p["coordinates"][1], p["coordinates"][0], holed["coordinates"]) for p in holed_points],
+    )
+    result["geometry_within_radius_points"] = (
+        geometry_within_radius,
+        [(geometry, center, 50000) for geometry in phenomena],
+    )
+    result["geometry_within_radius_polygon"] = (
+        geometry_within_radius,
+        [(star, center, 500000)],
+    )
+    result["point_distance"] = (
+        point_distance,
+        [(center, geometry) for geometry in phenomena],
+    )
+    # Radius queries over a bulletin with many phenomena, scan and grid buckets
+    dense = fixtures.phenomena("20240101", 20000, SEED)
+    result["phenomena_within_scan"] = (
+        lambda point, radius: [
+            i
+            for i, feature in enumerate(dense["features"])
+            if geometry_within_radius(feature["geometry"], point, radius)
+        ],
+        [(point, 50000) for point in zone_points[:20]],
+    )
+    result["phenomena_within_grid"] = (
+        PhenomenaIndex(dense).within,
+        [(point, 50000) for point in zone_points[:20]],
+    )
+    result["calculate_initial_compass_bearing"] = (calculate_initial_compass_bearing, pairs)
+    index = ZoneIndex({"features": [{"geometry": g, "properties": {}} for g in zones]})
+    result["zone_nearest"] = (index.nearest, [(point,) for point in zone_points])
+    simplified = ZoneIndex(
+        {"features": [{"geometry": g, "properties": {}} for g in zones]}, SIMPLIFY
+    )
+    result["zone_find"] = (index.find, [(point,) for point in zone_points])
+    result["zone_find_simplified"] = (simplified.find, [(point,) for point in zone_points])
+    detailed = boundaries(STRESS_VERTICES // 4)[0]["coordinates"]
+    result["simplify_coords"] = (simplify_coords, [(detailed, SIMPLIFY)])
+    # Boundaries of two adjacent zones; the naive reference only on the small ones
+    small = boundaries(250)
+    result["linestrings_intersect_boundary"] = (linestrings_intersect, [small])
+    result["_linestrings_intersect_naive_boundary"] = (_linestrings_intersect_naive, [small])
+    result["linestrings_intersect_detailed"] = (
+        linestrings_intersect,
+        [boundaries(STRESS_VERTICES // 4)],
+    )
+    return result
+
+
+def run(zones: list, only: str | None = None) -> dict:
+    results = {}
+    for name, (func, args) in cases(zones).items():
+        if only and only not in name:
+            continue
+        us_per_call, outputs = measure(func, args)
+        results[name] = {
+            "us_per_call": round(us_per_call, 3),
+            "calls": len(args),
+            "digest": digest(outputs),
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """Return the comparison of every case with the baseline.
+
+    Accelerated engines are compared with the baseline of the reference
+    engine, so their digest proves the equivalence and their ratio the gain.
+    """
+    rows = []
+    for name, result in results.items():
+        reference = name.split("[")[0] + "[reference]" if "[" in name else name
+        base = baseline.get(name) or baseline.get(reference)
+        if not base:
+            rows.append((name, result["us_per_call"], None, None))
+            continue
+        ratio = round(result["us_per_call"] / base["us_per_call"], 3)
+        rows.append((name, result["us_per_call"], ratio, result["digest"] == base["digest"]))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of core.geometry.")
+    parser.add_argument("--fixtures", type=Path, help="mirror with a criticality bulletin")
+    parser.add_argument("--case", help="run only the cases containing this text")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run(load_zones(args.fixtures), args.case)
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    rows = compare(results, baseline)
+
+    if args.json:
+        print(
+            json.dumps(
+                [
+                    {"case": name, **results[name], "ratio": ratio, "equivalent": same}
+                    for name, _, ratio, same in rows
+                ],
+                indent=2,
+            )
+        )
+    else:
+        print(f"{'case':50} {'us/call':>12} {'ratio':>8} {'equivalent':>10}")
+        for name, us_per_call, ratio, same in rows:
+            print(f"{name:50} {us_per_call:12.3f} {str(ratio):>8} {str(same):>10}")
+
+    if any(same is False for *_, same in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
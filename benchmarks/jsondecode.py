@@ -0,0 +1,111 @@
+"""Benchmark of the JSON backends of core.jsondecode on the bulletin GeoJSON.
+
+Decodes every bulletin of a mirror (see benchmarks/fixtures.py) from its
+bytes, as fetch_and_parse does, with every installed backend, and the
+stdlib json from a decoded str, as the client did before.
+
+    python -m benchmarks.jsondecode [--fixtures DIR] [--json]
+
+Without --fixtures a synthetic mirror is generated in a temporary directory;
+recorded bulletins give the real figures. Every backend must decode the same
+documents as json, or the run fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.jsondecode import BACKENDS
+
+from . import fixtures
+
+MIN_TIME = 0.5  # seconds per backend
+
+
+def load_bulletins(root: Path) -> dict:
+    """Return the bytes of every bulletin GeoJSON of a mirror, by file name."""
+    return {
+        path.name: path.read_bytes()
+        for path in sorted(Path(root).rglob("*.json"))
+        if "geojson" in path.as_posix()
+    }
+
+
+def measure(loads, documents: list, min_time: float = MIN_TIME) -> float:
+    """Return the best time to decode all the documents, in milliseconds."""
+    best = float("inf")
+    elapsed = 0.0
+    while elapsed < min_time or best == float("inf"):
+        start = time.perf_counter()
+        for document in documents:
+            loads(document)
+        run = time.perf_counter() - start
+        elapsed += run
+        best = min(best, run)
+    return best * 1000
+
+
+def run(bulletins: dict) -> list:
+    """Return name, ms, MB/s, ratio and equivalence of every backend."""
+    documents = list(bulletins.values())
+    size = sum(map(len, documents)) / 1e6
+    expected = [json.loads(document) for document in documents]
+    cases = {"json[str]": (lambda data: json.loads(data.decode("utf-8")), documents)}
+    cases.update({f"{name}[bytes]": (loads, documents) for name, loads in BACKENDS.items()})
+
+    rows = []
+    reference = None
+    for name, (loads, args) in cases.items():
+        same = [loads(document) for document in args] == expected
+        ms = measure(loads, args)
+        reference = reference or ms
+        rows.append(
+            (name, round(ms, 3), round(size / ms * 1000, 1), round(ms / reference, 3), same)
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the JSON backends.")
+    parser.add_argument("--fixtures", type=Path, help="mirror of the upstream urls")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bulletins = load_bulletins(args.fixtures or fixtures.generate(Path(tmp)))
+    rows = run(bulletins)
+
+    if args.json:
+        print(
+            json.dumps(
+                [
+                    {
+                        "backend": name,
+                        "ms": ms,
+                        "mb_per_s": speed,
+                        "ratio": ratio,
+                        "equivalent": same,
+                    }
+                    for name, ms, speed, ratio, same in rows
+                ],
+                indent=2,
+            )
+        )
+    else:
+        size = sum(map(len, bulletins.values())) / 1e6
+        print(f"{len(bulletins)} bulletins, {size:.1f} MB")
+        print(f"{'backend':20} {'ms':>10} {'MB/s':>8} {'ratio':>8} {'equivalent':>10}")
+        for name, ms, speed, ratio, same in rows:
+            print(f"{name:20} {ms:10.3f} {speed:8.1f} {ratio:8.3f} {str(same):>10}")
+
+    if not all(same for *_, same in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""Offline replay benchmark of DpcApiClient.async_get_data.
+
+A local aiohttp server stands in for the DPC site and raw GitHub, serving a
+mirror of the upstream urls (see benchmarks/fixtures.py). The client is driven
+end to end, without network, across the refresh scenarios of the integration.
+
+    python -m benchmarks.replay [--fixtures DIR] [--repeat 5] [--json]
+
+Without --fixtures a synthetic mirror is generated in a temporary directory.
+Recorded bulletins published on any date are replayed as if published today.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+from core import DpcApiClient
+from core.const import (
+    CRIT_API_URL,
+    CRIT_BULLETIN_URL,
+    CRIT_PATTERN_URL,
+    REGEX_DPC_ID,
+    REGEX_DPC_ID_DATETIME,
+    VIGI_API_URL,
+    VIGI_BULLETIN_URL,
+)
+from core.github import GITHUB_LIMIT, GITHUB_RESERVE, GITHUB_WINDOW
+from core.session import create_session
+
+from . import fixtures
+
+LATITUDE = 41.9
+LONGITUDE = 12.5
+RADIUS = 50
+SLOW_DELAY = 5  # seconds of the slow mirror
+RETRY_AFTER = 60  # seconds of the Retry-After of the GitHub API
+
+
+class MirrorServer:
+    """Local stand-in for the DPC site and raw GitHub."""
+
+    def __init__(self, root: Path) -> None:
+        self._root = Path(root)
+        self._files: dict[str, bytes] = {}
+        for path in self._root.rglob("*"):
+            if path.is_file():
+                self._files["/" + path.relative_to(self._root).as_posix()] = path.read_bytes()
+
+        crit_page = self._files[self.local_path(CRIT_BULLETIN_URL)].decode()
+        vigi_page = self._files[self.local_path(VIGI_BULLETIN_URL)].decode()
+        self.recorded_crit = REGEX_DPC_ID_DATETIME.findall(crit_page)[0]
+        self.recorded_vigi = REGEX_DPC_ID.findall(vigi_page)[0][0]
+        self.id_crit = self.id_vigi = None
+        self.failing: set[str] = set()
+        self.slow = False
+        self.github_remaining = GITHUB_LIMIT
+        self.github_reset = 0
+        self.github_retry_after = None
+        self.requests = Counter()  # (host, status) -> requests
+        self.reset()
+
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._runner = None
+
+    @staticmethod
+    def local_path(url: str) -> str:
+        parts = urlsplit(url)
+        path = parts.path + ("index.html" if parts.path.endswith("/") else "")
+        return f"/{parts.netloc}{path}"
+
+    def reset(self) -> None:
+        """Serve the recorded bulletins as published today."""
+        today = date.today()
+        self.id_crit = f"{today:%Y%m%d}{self.recorded_crit[8:]}"
+        self.id_vigi = f"{today:%Y%m%d}"
+        self.failing = set()
+        self.slow = False
+        self.github_remaining = GITHUB_LIMIT
+        self.github_reset = int(time.time()) + GITHUB_WINDOW
+        self.github_retry_after = None
+
+    def publish_new_criticality(self) -> None:
+        """Publish the same criticality bulletin under a new id."""
+        pub_date = datetime.strptime(self.id_crit, "%Y%m%d_%H%M") + timedelta(minutes=1)
+        self.id_crit = pub_date.strftime("%Y%m%d_%H%M")
+
+    def fail(self, url: str) -> None:
+        """Answer 500 for url."""
+        self.failing.add(self.local_path(url))
+
+    def github_listing(self, path: str) -> list:
+        """Return the listing of files/ of a repository, with the bulletins of 3 days."""
+        today = date.today()
+        days = [f"{today - timedelta(days=offset):%Y%m%d}" for offset in (2, 1)]
+        if "Criticita" in path:
+            ids = [f"{day}_1500" for day in days] + [self.id_crit]
+            names = [f"{id}_{day}.json" for id in ids for day in ("today", "tomorrow")]
+        else:
+            ids = days + [self.id_vigi]
+            names = [f"{id}_{day}.json" for id in ids for day in ("oggi", "domani")]
+        names += ["README.md", "geojson", "preview"]
+        return [
+            {"name": name, "path": f"files/{name}", "type": "file" if "." in name else "dir"}
+            for name in sorted(names)
+        ]
+
+    def _github(self, request: web.Request, path: str) -> web.Response:
+        """Answer as the GitHub API: rate limit headers, ETags and Retry-After."""
+        headers = {
+            "X-RateLimit-Limit": str(GITHUB_LIMIT),
+            "X-RateLimit-Remaining": str(self.github_remaining),
+            "X-RateLimit-Reset": str(self.github_reset),
+        }
+        if self.github_retry_after is not None:
+            # A secondary rate limit: requests are left, but none before Retry-After
+            headers["Retry-After"] = str(self.github_retry_after)
+            return web.json_response({"message": "rate limit"}, status=403, headers=headers)
+        body = json.dumps(self.github_listing(path)).encode()
+        headers["ETag"] = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == headers["ETag"]:
+            # Conditional requests answered 304 are not counted by GitHub
+            return web.Response(status=304, headers=headers)
+        self.github_remaining -= 1
+        headers["X-RateLimit-Remaining"] = str(self.github_remaining)
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        response = await self._respond(request)
+        self.requests[request.path.split("/")[1], response.status] += 1
+        return response
+
+    async def _respond(self, request: web.Request) -> web.Response:
+        # The mirrors of the client ask the pages by their upstream path
+        path = request.path + ("index.html" if request.path.endswith("/") else "")
+        if path.startswith("/slow/"):
+            # The same files behind a slow mirror
+            path = path[len("/slow") :]
+            if self.slow:
+                await asyncio.sleep(SLOW_DELAY)
+        if path in self.failing:
+            return web.Response(status=500)
+        if path in (self.local_path(CRIT_API_URL), self.local_path(VIGI_API_URL)):
+            return self._github(request, path)
+        if "Criticita" in path:
+            path = path.replace(self.id_crit, self.recorded_crit)
+        elif "Vigilanza" in path:
+            path = path.replace(self.id_vigi, self.recorded_vigi)
+        body = self._files.get(path)
+        if body is None:
+            return web.Response(status=404)
+        if path == self.local_path(CRIT_BULLETIN_URL):
+            body = body.replace(self.recorded_crit.encode(), self.id_crit.encode())
+        elif path == self.local_path(VIGI_BULLETIN_URL):
+            body = body.replace(self.recorded_vigi.encode(), self.id_vigi.encode())
+        return web.Response(body=body)
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def start(self) -> None:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    async def _stop(self) -> None:
+        await self._runner.cleanup()
+        # The requests to the slow mirror the clients gave up on
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+class RewriteSession:
+    """Session sending every upstream request to the mirror server."""
+
+    def __init__(self, session: aiohttp.ClientSession, port: int) -> None:
+        self._session = session
+        self._base = f"http://127.0.0.1:{port}"
+
+    def get(self, url: str, **kwargs):
+        return self._session.get(self._base + MirrorServer.local_path(url), **kwargs)
+
+
+class LoopMonitor:
+    """Measure how long the event loop is blocked."""
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self._interval = interval
+        self._task = None
+        self.blocked = 0.0
+        self.max_lag = 0.0
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            lag = time.perf_counter() - start - self._interval
+            if lag > self._interval:
+                self.blocked += lag
+                self.max_lag = max(self.max_lag, lag)
+
+    def __enter__(self):
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._task.cancel()
+
+
+@dataclass
+class Result:
+    scenario: str
+    wall_ms: list = field(default_factory=list)
+    loop_blocked_ms: list = field(default_factory=list)
+    max_lag_ms: list = field(default_factory=list)
+    peak_memory_kib: float = 0.0
+    bytes_downloaded: int = 0
+    pending_full_update: bool = False
+    ids_current: bool = False
+    requests: dict = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        return {
+            "scenario": self.scenario,
+            "wall_ms_min": round(min(self.wall_ms), 2),
+            "wall_ms_median": round(statistics.median(self.wall_ms), 2),
+            "loop_blocked_ms_median": round(statistics.median(self.loop_blocked_ms), 2),
+            "max_lag_ms_median": round(statistics.median(self.max_lag_ms), 2),
+            "peak_memory_kib": round(self.peak_memory_kib, 1),
+            "bytes_downloaded": self.bytes_downloaded,
+            "pending_full_update": self.pending_full_update,
+            "ids_current": self.ids_current,
+            "requests": ", ".join(
+                f"{host} {status}x{count}"
+                for (host, status), count in sorted(self.requests.items())
+            ),
+        }
+
+
+class Environment:
+    """Build clients talking to the mirror server."""
+
+    def __init__(self, server: MirrorServer, session: aiohttp.ClientSession) -> None:
+        self.server = server
+        self.session = RewriteSession(session, server.port)
+        self.mirror_session = session
+
+    def client(self, interval: timedelta = timedelta(0), **options) -> DpcApiClient:
+        # With a zero interval the refresh is never in the midnight window.
+        return DpcApiClient(
+            "bench", LATITUDE, LONGITUDE, "", RADIUS, self.session, interval, **options
+        )
+
+    def mirrored_client(self, mirrors: list, hedged: bool = False) -> DpcApiClient:
+        """Return a client fetching from the mirrors, the server as one of them."""
+        return DpcApiClient(
+            "bench",
+            LATITUDE,
+            LONGITUDE,
+            "",
+            RADIUS,
+            self.mirror_session,
+            timedelta(0),
+            mirrors=mirrors,
+            hedged=hedged,
+        )
+
+
+async def cold_start(env: Environment) -> DpcApiClient:
+    return env.client()
+
+
+async def cold_start_streamed(env: Environment) -> DpcApiClient:
+    return env.client(stream_parse=True)
+
+
+async def no_change(env: Environment) -> DpcApiClient:
+    client = env.client()
+    await client.async_get_data()
+    return client
+
+
+async def new_id(env: Environment) -> DpcApiClient:
+    client = env.client()
+    await client.async_get_data()
+    env.server.publish_new_criticality()
+    return client
+
+
+async def midnight_swap(env: Environment) -> DpcApiClient:
+    # A one day interval keeps every refresh between midnight and the first update.
+    client = env.client(timedelta(days=1))
+    await client.async_get_data()
+    return client
+
+
+async def partial_failure(env: Environment) -> DpcApiClient:
+    env.server.fail(CRIT_PATTERN_URL.format(env.server.id_crit, "tomorrow"))
+    return env.client()
+
+
+async def mirror_failover(env: Environment) -> DpcApiClient:
+    # The first mirror refuses the connections: it fails once, then is skipped.
+    return env.mirrored_client(["http://127.0.0.1:9", f"http://127.0.0.1:{env.server.port}"])
+
+
+async def _slow_mirror(env: Environment, hedged: bool) -> DpcApiClient:
+    # Refreshes at full speed give the latencies, then the first mirror slows down.
+    base = f"http://127.0.0.1:{env.server.port}"
+    client = env.mirrored_client([f"{base}/slow", base], hedged)
+    for _ in range(5):
+        env.server.publish_new_criticality()
+        await client.async_get_data()
+    env.server.slow = True
+    env.server.publish_new_criticality()
+    return client
+
+
+async def slow_mirror(env: Environment) -> DpcApiClient:
+    return await _slow_mirror(env, hedged=False)
+
+
+async def slow_mirror_hedged(env: Environment) -> DpcApiClient:
+    return await _slow_mirror(env, hedged=True)
+
+
+async def github_api(env: Environment) -> DpcApiClient:
+    # The ids from the listings of the GitHub API, well within the budget.
+    return env.client(github_api=True)
+
+
+async def github_api_reserve(env: Environment) -> DpcApiClient:
+    # The answers of a first refresh leave the reserve of the limit only.
+    env.server.github_remaining = math.ceil(GITHUB_LIMIT * GITHUB_RESERVE) + 1
+    client = env.client(github_api=True)
+    await client.async_get_data()
+    return client
+
+
+async def github_api_retry_after(env: Environment) -> DpcApiClient:
+    # A first refresh is answered 403 with Retry-After, then the API answers again.
+    env.server.github_retry_after = RETRY_AFTER
+    client = env.client(github_api=True)
+    await client.async_get_data()
+    env.server.github_retry_after = None
+    return client
+
+
+async def github_api_etag(env: Environment) -> DpcApiClient:
+    # Unchanged listings are answered 304: without the requests given back the
+    # burst of the budget would be spent by the second refresh.
+    client = env.client(github_api=True)
+    for _ in range(3):
+        await client.async_get_data()
+    return client
+
+
+SCENARIOS = {
+    "cold_start": cold_start,
+    "cold_start_streamed": cold_start_streamed,
+    "no_change": no_change,
+    "new_id": new_id,
+    "midnight_swap": midnight_swap,
+    "partial_failure": partial_failure,
+    "mirror_failover": mirror_failover,
+    "slow_mirror": slow_mirror,
+    "slow_mirror_hedged": slow_mirror_hedged,
+    "github_api": github_api,
+    "github_api_reserve": github_api_reserve,
+    "github_api_retry_after": github_api_retry_after,
+    "github_api_etag": github_api_etag,
+}
+
+
+async def run_scenario(env: Environment, name: str, repeat: int) -> Result:
+    prepare = SCENARIOS[name]
+    result = Result(name)
+    for _ in range(repeat):
+        env.server.reset()
+        client = await prepare(env)
+        env.server.requests.clear()
+        with LoopMonitor() as monitor:
+            start = time.perf_counter()
+            await client.async_get_data()
+            result.wall_ms.append((time.perf_counter() - start) * 1000)
+        result.loop_blocked_ms.append(monitor.blocked * 1000)
+        result.max_lag_ms.append(monitor.max_lag * 1000)
+        result.bytes_downloaded = client.metrics["bytes_downloaded"]
+        result.pending_full_update = client._pending_full_update
+        result.ids_current = (client._id_crit, client._id_vigi) == (
+            env.server.id_crit,
+            env.server.id_vigi,
+        )
+        result.requests = dict(env.server.requests)
+
+    env.server.reset()
+    client = await prepare(env)
+    tracemalloc.start()
+    await client.async_get_data()
+    result.peak_memory_kib = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    env.server.reset()
+    return result
+
+
+async def run(root: Path, scenarios: list, repeat: int) -> list:
+    server = MirrorServer(root)
+    server.start()
+    try:
+        async with create_session() as session:
+            env = Environment(server, session)
+            return [await run_scenario(env, name, repeat) for name in scenarios]
+    finally:
+        server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay benchmark of the DPC client.")
+    parser.add_argument("--fixtures", type=Path, help="mirror of the upstream urls")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    parser.add_argument("--verbose", action="store_true", help="show the client logs")
+    args = parser.parse_args()
+    if not args.verbose:
+        # The failure scenarios log the failed fetches on purpose.
+        logging.getLogger("core").setLevel(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.fixtures or fixtures.generate(Path(tmp))
+        results = asyncio.run(run(root, args.scenario or list(SCENARIOS), args.repeat))
+
+    summaries = [result.summary() for result in results]
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+        return
+    columns = list(summaries[0])
+    print(" | ".join(columns))
+    for summary in summaries:
+        print(" | ".join(str(summary[column]) for column in columns))
+
+
+if __name__ == "__main__":
+    main()
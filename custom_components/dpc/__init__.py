@@ -3,14 +3,21 @@ Custom integration to integrate DPC-Alert with Home Assistant.
 
 For more details about this integration, please refer to
 https://github.com/caiosweet/Home-Assistant-custom-components-DPC-Alert
+
+The fetch and parse core (.core) does not import Home Assistant nor this
+package: with custom_components/dpc on the path it is imported as the top
+level package core by the command line and the benchmarks.
 """
 
 from __future__ import annotations
 
 import asyncio
 from datetime import timedelta
+from weakref import WeakValueDictionary
 
+import aiohttp
 import homeassistant.helpers.config_validation as cv
+from aiohttp.hdrs import USER_AGENT
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     CONF_LATITUDE,
@@ -18,17 +25,35 @@ from homeassistant.const import (
     CONF_NAME,
     CONF_RADIUS,
     CONF_SCAN_INTERVAL,
+    EVENT_HOMEASSISTANT_CLOSE,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import event
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.aiohttp_client import (
+    ENABLE_CLEANUP_CLOSED,
+    SERVER_SOFTWARE,
+)
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import ssl as ssl_util
 
-from .api import DpcApiClient, DpcApiException
 from .const import (
+    CONF_ARCHIVE,
+    CONF_GITHUB_API,
+    CONF_GITHUB_TOKEN,
+    CONF_HEDGED_FETCH,
+    CONF_MIRRORS,
     CONF_MUNICIPALITY,
+    CONF_PHENOMENA_DEDUP,
+    CONF_PHENOMENA_LIMIT,
+    CONF_RADIUS_ZONES,
+    CONF_SIMPLIFY_TOLERANCE,
+    CONF_STREAM_PARSE,
+    DATA_ARCHIVE,
+    DATA_GITHUB,
+    DATA_INDEXES,
+    DATA_SESSION,
     DEFAULT_RADIUS,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
@@ -36,6 +61,12 @@ from .const import (
     PLATFORMS,
     STARTUP_MESSAGE,
 )
+from .core import ARCHIVE_FILE, BulletinArchive, DpcApiClient, DpcApiException
+from .core.endpoints import parse_mirrors
+from .core.github import RateLimitBudget
+from .core.session import create_session
+from .services import async_setup_services
+from .views import DpcPreviewView, DpcZonesView
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
@@ -43,9 +74,68 @@ CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up this integration using YAML is not supported."""
     del config
+    await async_setup_services(hass)
+    hass.http.register_view(DpcPreviewView(hass))
+    hass.http.register_view(DpcZonesView(hass))
     return True
 
 
+def get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the session of the DPC endpoints, shared by all the entries."""
+    if DATA_SESSION not in hass.data:
+        session = create_session(
+            ssl_util.get_default_context(),
+            ENABLE_CLEANUP_CLOSED,
+            {USER_AGENT: SERVER_SOFTWARE},
+        )
+        hass.data[DATA_SESSION] = session
+
+        async def _async_close_session(event: Event) -> None:
+            await session.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+    return hass.data[DATA_SESSION]
+
+
+def get_archive(hass: HomeAssistant) -> BulletinArchive:
+    """Return the archive of the bulletins, shared by all the entries."""
+    if DATA_ARCHIVE not in hass.data:
+        archive = BulletinArchive(hass.config.path(ARCHIVE_FILE))
+        hass.data[DATA_ARCHIVE] = archive
+
+        async def _async_close_archive(event: Event) -> None:
+            await hass.async_add_executor_job(archive.close)
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_archive)
+    return hass.data[DATA_ARCHIVE]
+
+
+async def async_release_archive(hass: HomeAssistant) -> None:
+    """Close the connection of the archive when no entry loaded uses it.
+
+    The archive connects again on the next use.
+    """
+    archive = hass.data.get(DATA_ARCHIVE)
+    if archive is not None and not any(
+        coordinator.api._archive is archive
+        for coordinator in hass.data.get(DOMAIN, {}).values()
+    ):
+        await hass.async_add_executor_job(archive.close)
+
+
+def get_indexes(hass: HomeAssistant) -> WeakValueDictionary:
+    """Return the indexes of the decoded bulletins by url, shared by all the entries."""
+    return hass.data.setdefault(DATA_INDEXES, WeakValueDictionary())
+
+
+def get_github_budget(hass: HomeAssistant, token: str) -> RateLimitBudget:
+    """Return the budget of the GitHub API of a token, shared by all the entries."""
+    budgets = hass.data.setdefault(DATA_GITHUB, {})
+    if token not in budgets:
+        budgets[token] = RateLimitBudget(token)
+    return budgets[token]
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
     if hass.data.get(DOMAIN) is None:
@@ -60,7 +150,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         minutes=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
     )
     radius = entry.options.get(CONF_RADIUS, DEFAULT_RADIUS)
-    session = async_get_clientsession(hass)
+    radius_zones = entry.options.get(CONF_RADIUS_ZONES, False)
+    simplify_tolerance = entry.options.get(CONF_SIMPLIFY_TOLERANCE, 0)
+    phenomena_limit = entry.options.get(CONF_PHENOMENA_LIMIT, 0)
+    phenomena_dedup = entry.options.get(CONF_PHENOMENA_DEDUP, False)
+    mirrors = parse_mirrors(entry.options.get(CONF_MIRRORS, "")) or []
+    hedged = entry.options.get(CONF_HEDGED_FETCH, False)
+    github_api = entry.options.get(CONF_GITHUB_API, False)
+    github = get_github_budget(hass, entry.options.get(CONF_GITHUB_TOKEN, ""))
+    stream_parse = entry.options.get(CONF_STREAM_PARSE, False)
+    archive = None
+    if entry.options.get(CONF_ARCHIVE, False):
+        archive = get_archive(hass)
+    session = get_session(hass)
     client = DpcApiClient(
         location_name,
         latitude,
@@ -69,6 +171,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         radius,
         session,
         update_interval,
+        radius_zones,
+        simplify_tolerance,
+        phenomena_limit,
+        phenomena_dedup,
+        archive,
+        mirrors,
+        hedged,
+        github_api,
+        github,
+        stream_parse,
+        get_indexes(hass),
     )
 
     coordinator = DpcDataUpdateCoordinator(
@@ -77,6 +190,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await coordinator.async_refresh()
 
     if not coordinator.last_update_success:
+        if archive is not None:
+            await async_release_archive(hass)
         raise ConfigEntryNotReady
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
@@ -103,6 +218,11 @@ class DpcDataUpdateCoordinator(DataUpdateCoordinator):
         self.platforms = []
         super().__init__(hass, LOGGER, name=DOMAIN, update_interval=update_interval)
 
+    @property
+    def metrics(self) -> dict:
+        """Return the performance metrics of the last refresh."""
+        return self.api.metrics
+
     async def _async_update_data(self):
         """Update data via library."""
         try:
@@ -144,6 +264,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
     if unloaded:
         hass.data[DOMAIN].pop(entry.entry_id)
+        if coordinator.api._archive is not None:
+            await async_release_archive(hass)
 
     return unloaded
 
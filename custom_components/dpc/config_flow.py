@@ -11,9 +11,26 @@ from homeassistant.const import (
     CONF_SCAN_INTERVAL,
 )
 from homeassistant.core import callback
+from homeassistant.helpers.selector import (
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
+)
 
 from .const import (
+    CONF_ARCHIVE,
+    CONF_CLEAR_GITHUB_TOKEN,
+    CONF_CLEAR_MIRRORS,
+    CONF_GITHUB_API,
+    CONF_GITHUB_TOKEN,
+    CONF_HEDGED_FETCH,
+    CONF_MIRRORS,
     CONF_MUNICIPALITY,
+    CONF_PHENOMENA_DEDUP,
+    CONF_PHENOMENA_LIMIT,
+    CONF_RADIUS_ZONES,
+    CONF_SIMPLIFY_TOLERANCE,
+    CONF_STREAM_PARSE,
     CONF_WARNING_LEVEL,
     DEFAULT_NAME,
     DEFAULT_RADIUS,
@@ -23,6 +40,13 @@ from .const import (
     PLATFORMS,
     WARNING_ALERT,
 )
+from .core.endpoints import parse_mirrors
+
+# Options holding credentials, never shown again, and the options clearing them
+SECRET_OPTIONS = {
+    CONF_MIRRORS: CONF_CLEAR_MIRRORS,
+    CONF_GITHUB_TOKEN: CONF_CLEAR_GITHUB_TOKEN,
+}
 
 
 class DpcFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -75,9 +99,16 @@ class DpcOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
+        errors = {}
         if user_input is not None:
-            self.options.update(user_input)
-            return await self._update_options()
+            self._keep_secrets(user_input)
+            if parse_mirrors(user_input.get(CONF_MIRRORS, "")) is None:
+                errors[CONF_MIRRORS] = "mirrors"
+            elif self._municipality_known(user_input.get(CONF_MUNICIPALITY, "")):
+                self.options.update(user_input)
+                return await self._update_options()
+            else:
+                errors[CONF_MUNICIPALITY] = "municipality"
 
         schema = {
             vol.Required(x, default=self.options.get(x, True)): bool for x in sorted(PLATFORMS)
@@ -101,9 +132,69 @@ class DpcOptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_RADIUS,
                     default=self.options.get(CONF_RADIUS, DEFAULT_RADIUS),
                 ): vol.Coerce(float),
+                vol.Optional(
+                    CONF_RADIUS_ZONES,
+                    default=self.options.get(CONF_RADIUS_ZONES, False),
+                ): bool,
+                vol.Optional(
+                    CONF_SIMPLIFY_TOLERANCE,
+                    default=self.options.get(CONF_SIMPLIFY_TOLERANCE, 0),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_PHENOMENA_LIMIT,
+                    default=self.options.get(CONF_PHENOMENA_LIMIT, 0),
+                ): cv.positive_int,
+                vol.Optional(
+                    CONF_PHENOMENA_DEDUP,
+                    default=self.options.get(CONF_PHENOMENA_DEDUP, False),
+                ): bool,
+                vol.Optional(
+                    CONF_ARCHIVE,
+                    default=self.options.get(CONF_ARCHIVE, False),
+                ): bool,
+                vol.Optional(CONF_MIRRORS): TextSelector(
+                    TextSelectorConfig(type=TextSelectorType.PASSWORD)
+                ),
+                vol.Optional(CONF_CLEAR_MIRRORS, default=False): bool,
+                vol.Optional(
+                    CONF_HEDGED_FETCH,
+                    default=self.options.get(CONF_HEDGED_FETCH, False),
+                ): bool,
+                vol.Optional(
+                    CONF_GITHUB_API,
+                    default=self.options.get(CONF_GITHUB_API, False),
+                ): bool,
+                vol.Optional(CONF_GITHUB_TOKEN): TextSelector(
+                    TextSelectorConfig(type=TextSelectorType.PASSWORD)
+                ),
+                vol.Optional(CONF_CLEAR_GITHUB_TOKEN, default=False): bool,
+                vol.Optional(
+                    CONF_STREAM_PARSE,
+                    default=self.options.get(CONF_STREAM_PARSE, False),
+                ): bool,
             }
         )
-        return self.async_show_form(step_id="user", data_schema=vol.Schema(schema))
+        return self.async_show_form(
+            step_id="user", data_schema=vol.Schema(schema), errors=errors
+        )
+
+    def _keep_secrets(self, user_input: dict) -> None:
+        """Keep the saved secret options left empty, clear the ones asked."""
+        for option, clear in SECRET_OPTIONS.items():
+            if user_input.pop(clear, False):
+                user_input[option] = ""
+            elif not user_input.get(option):
+                user_input[option] = self.options.get(option, "")
+
+    def _municipality_known(self, municipality: str) -> bool:
+        """Check the municipality in the table of the loaded bulletins, if any."""
+        if not municipality:
+            return True
+        for coordinator in self.hass.data.get(DOMAIN, {}).values():
+            known = coordinator.api.has_municipality(municipality)
+            if known is not None:
+                return known
+        return True
 
     async def _update_options(self):
         """Update config entry options."""
@@ -0,0 +1,12 @@
+"""DPC bulletins client, parsers and geometry, free of Home Assistant imports."""
+
+from .archive import ARCHIVE_FILE, BulletinArchive
+from .client import DpcApiClient, DpcApiException, Target
+
+__all__ = [
+    "ARCHIVE_FILE",
+    "BulletinArchive",
+    "DpcApiClient",
+    "DpcApiException",
+    "Target",
+]
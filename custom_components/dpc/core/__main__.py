@@ -0,0 +1,190 @@
+"""Run the DPC resolution offline against local GeoJSON files.
+
+    python -m core --lat 41.9 --lon 12.5 [--municipality Roma]
+        [--radius 50] [--radius-zones] [--simplify 50] [--limit 10] [--dedup]
+        FILE [FILE ...]
+    python -m core --points points.csv FILE [FILE ...]
+
+with custom_components/dpc on PYTHONPATH, so Home Assistant is not imported.
+
+FILEs keep the names of the DPC repositories (files/geojson/), e.g.
+20240101_1500_today.json for the criticality and 20240101_oggi.json or
+20240101_fenomeni_oggi.json for the vigilance. The points file is a CSV with
+latitude,longitude[,municipality] rows; one JSON result per point is printed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from . import DpcApiClient, Target
+from .const import (
+    CRIT_PATTERN_URL,
+    CRITICALITY,
+    DEFAULT_NAME,
+    DEFAULT_RADIUS,
+    REGEX_CRIT_FILE,
+    REGEX_VIGI_FILE,
+    VIGI_PATTERN_URL,
+    VIGILANCE,
+)
+from .jsondecode import loads
+
+
+def load_bulletins(paths: list) -> tuple[dict, list]:
+    """Return the bulletin ids and the (kind, url, geojson) of every file."""
+    ids = {}
+    bulletins = []
+    for path in paths:
+        path = Path(path)
+        if match := REGEX_CRIT_FILE.match(path.name):
+            kind, url = CRITICALITY, CRIT_PATTERN_URL.format(*match.groups())
+        elif match := REGEX_VIGI_FILE.match(path.name):
+            kind, url = VIGILANCE, VIGI_PATTERN_URL.format(*match.groups())
+        else:
+            raise SystemExit(f"Not a DPC bulletin file name: {path.name}")
+        if ids.setdefault(kind, match.group(1)) != match.group(1):
+            raise SystemExit(f"Files of different {kind} bulletins: {path.name}")
+        bulletins.append((kind, url, loads(path.read_bytes())))
+    return ids, bulletins
+
+
+def load_client(
+    ids: dict,
+    bulletins: list,
+    radius: float,
+    radius_zones: bool = False,
+    simplify_tolerance: float = 0,
+    phenomena_limit: int = 0,
+    phenomena_dedup: bool = False,
+) -> DpcApiClient:
+    """Return a client holding the indexed bulletins, as after async_get_data."""
+    client = DpcApiClient(
+        DEFAULT_NAME,
+        0,
+        0,
+        "",
+        radius,
+        None,
+        timedelta(0),
+        radius_zones,
+        simplify_tolerance,
+        phenomena_limit,
+        phenomena_dedup,
+    )
+    client._data = {CRITICALITY: {}, VIGILANCE: {}}
+    if CRITICALITY in ids:
+        client._id_crit = ids[CRITICALITY]
+        client._pub_date_crit = datetime.strptime(client._id_crit, "%Y%m%d_%H%M")
+    if VIGILANCE in ids:
+        client._id_vigi = ids[VIGILANCE]
+        client._pub_date_vigi = datetime.strptime(client._id_vigi, "%Y%m%d")
+
+    for kind, url, geojs in bulletins:
+        client.get_index(kind, url, geojs)
+    return client
+
+
+def read_points(path: Path) -> list:
+    """Return (latitude, longitude, municipality) from a CSV file."""
+    points = []
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.reader(file):
+            if not row or row[0].strip().startswith("#"):
+                continue
+            try:
+                latitude, longitude = float(row[0]), float(row[1])
+            except ValueError:
+                continue  # header
+            municipality = row[2].strip() if len(row) > 2 else ""
+            points.append((latitude, longitude, municipality))
+    return points
+
+
+async def run(args: argparse.Namespace) -> None:
+    start = time.perf_counter()
+    ids, bulletins = load_bulletins(args.files)
+    client = load_client(
+        ids,
+        bulletins,
+        args.radius,
+        args.radius_zones,
+        args.simplify,
+        args.limit,
+        args.dedup,
+    )
+    load_time = time.perf_counter() - start
+
+    if args.points:
+        points = read_points(args.points)
+    else:
+        if args.lat is None or args.lon is None:
+            raise SystemExit("--lat and --lon or --points are required")
+        points = [(args.lat, args.lon, args.municipality)]
+
+    start = time.perf_counter()
+    for latitude, longitude, municipality in points:
+        point_start = time.perf_counter()
+        target = Target(DEFAULT_NAME, latitude, longitude, municipality)
+        data = (await client.resolve_many([target]))[0]
+        elapsed = (time.perf_counter() - point_start) * 1000
+        result = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "municipality": municipality,
+            "elapsed_ms": round(elapsed, 3),
+            **data,
+        }
+        if args.points:
+            print(json.dumps(result, default=str))
+        else:
+            print(json.dumps(result, default=str, indent=2))
+    resolve_time = time.perf_counter() - start
+
+    print(
+        f"Loaded {len(bulletins)} files in {load_time * 1000:.1f} ms, "
+        f"resolved {len(points)} points in {resolve_time * 1000:.1f} ms "
+        f"({len(points) / resolve_time:.1f} points/s)",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m core",
+        description="Resolve DPC bulletins offline against local GeoJSON files.",
+    )
+    parser.add_argument("files", nargs="+", type=Path, help="DPC GeoJSON files")
+    parser.add_argument("--lat", type=float, help="latitude of the location")
+    parser.add_argument("--lon", type=float, help="longitude of the location")
+    parser.add_argument("--municipality", default="", help="municipality of the location")
+    parser.add_argument(
+        "--radius", type=float, default=DEFAULT_RADIUS, help="phenomena radius (Km)"
+    )
+    parser.add_argument(
+        "--radius-zones",
+        action="store_true",
+        help="highest levels of all the zones within radius",
+    )
+    parser.add_argument(
+        "--simplify", type=float, default=0, help="simplify the zones (metres)"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=0, help="nearest phenomena only (0 all)"
+    )
+    parser.add_argument(
+        "--dedup", action="store_true", help="nearest phenomenon of each type only"
+    )
+    parser.add_argument("--points", type=Path, help="CSV of latitude,longitude[,municipality]")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Archive of the zone levels of the DPC bulletins in SQLite."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+from .const import (
+    CRITICALITY,
+    DOMANI,
+    DOPODOMANI,
+    LOGGER,
+    OGGI,
+    REGEX_CRIT_FILE,
+    REGEX_VIGI_FILE,
+    VIGILANCE,
+)
+from .index import _zone_levels
+
+ARCHIVE_FILE = "dpc_archive.db"
+VIGI_OFFSETS = {OGGI: 0, DOMANI: 1, DOPODOMANI: 2}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bulletin (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    bulletin TEXT NOT NULL,
+    date TEXT NOT NULL,
+    UNIQUE (kind, bulletin, date)
+);
+CREATE TABLE IF NOT EXISTS zone (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS municipality (
+    name TEXT NOT NULL COLLATE NOCASE,
+    zone INTEGER NOT NULL REFERENCES zone (id),
+    PRIMARY KEY (name, zone)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS level (
+    zone INTEGER NOT NULL REFERENCES zone (id),
+    date TEXT NOT NULL,
+    risk TEXT NOT NULL,
+    bulletin INTEGER NOT NULL REFERENCES bulletin (id),
+    level INTEGER NOT NULL,
+    PRIMARY KEY (zone, date, risk, bulletin)
+) WITHOUT ROWID;
+"""
+
+QUERY_HISTORY = """
+SELECT b.kind, b.bulletin, l.date, z.name, l.risk, l.level
+FROM level AS l
+JOIN zone AS z ON z.id = l.zone
+JOIN bulletin AS b ON b.id = l.bulletin
+WHERE l.zone IN ({zones}) AND l.date BETWEEN ? AND ?{risk}
+ORDER BY l.date, z.name, l.risk, b.kind, b.bulletin
+"""
+
+
+def archive_key(file_name: str) -> tuple[str, str, date] | None:
+    """Return (kind, bulletin id, day) of a file of zones, None for other files."""
+    if match := REGEX_CRIT_FILE.match(file_name):
+        bulletin_id, day = match.groups()
+        pub_date = datetime.strptime(bulletin_id, "%Y%m%d_%H%M").date()
+        return (
+            CRITICALITY,
+            bulletin_id,
+            pub_date + timedelta(days=1 if day == "tomorrow" else 0),
+        )
+    if (match := REGEX_VIGI_FILE.match(file_name)) and match.group(2) in VIGI_OFFSETS:
+        bulletin_id, day = match.groups()
+        pub_date = datetime.strptime(bulletin_id, "%Y%m%d").date()
+        return VIGILANCE, bulletin_id, pub_date + timedelta(days=VIGI_OFFSETS[day])
+    return None
+
+
+class BulletinArchive:
+    """Levels of every zone of the archived bulletins, by zone, date and risk.
+
+    Only the levels of the zones are kept, one row per zone, day and risk
+    (level, plus one per risk for the criticality), with the municipalities
+    of every zone. The primary key of the levels is the index of the queries
+    by zone and date range. The methods block on the database: call them in
+    an executor from the event loop.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._zones = {}  # Name -> id, of the zones already in the archive
+        self._members = set()  # (lowercase municipality, zone) already in the archive
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._zones.clear()
+                self._members.clear()
+
+    def has(self, kind: str, bulletin_id: str, day: date) -> bool:
+        """Return True if the bulletin of the day is already archived."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT 1 FROM bulletin WHERE kind = ? AND bulletin = ? AND date = ?",
+                    (kind, bulletin_id, day.isoformat()),
+                )
+                .fetchone()
+            )
+        return row is not None
+
+    def keys(self) -> set:
+        """Return the (kind, bulletin id, day) of every archived bulletin."""
+        with self._lock:
+            rows = self._connect().execute("SELECT kind, bulletin, date FROM bulletin")
+            return {
+                (kind, bulletin_id, date.fromisoformat(day))
+                for kind, bulletin_id, day in rows
+            }
+
+    def record(self, kind: str, bulletin_id: str, day: date, features: list) -> int:
+        """Archive the zones of a bulletin for a day, once. Return the levels written."""
+        written = self.record_many([(kind, bulletin_id, day, features)])
+        if written:
+            LOGGER.debug(
+                "Archived %s levels of the %s bulletin %s for %s",
+                written,
+                kind,
+                bulletin_id,
+                day,
+            )
+        return written
+
+    def record_many(self, bulletins: list) -> int:
+        """Archive (kind, bulletin id, day, features) in one transaction.
+
+        Return the levels written; the bulletins already archived are skipped.
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    return sum(
+                        self._insert(conn, kind, bulletin_id, day, features)
+                        for kind, bulletin_id, day, features in bulletins
+                    )
+            except sqlite3.Error:
+                # The ids cached in the transaction rolled back are not valid
+                self._zones.clear()
+                self._members.clear()
+                raise
+
+    def _insert(
+        self,
+        conn: sqlite3.Connection,
+        kind: str,
+        bulletin_id: str,
+        day: date,
+        features: list,
+    ) -> int:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO bulletin (kind, bulletin, date) VALUES (?, ?, ?)",
+            (kind, bulletin_id, day.isoformat()),
+        )
+        if not cursor.rowcount:
+            return 0
+        bulletin = cursor.lastrowid
+        levels = []
+        municipalities = []
+        for feature in features:
+            prop = feature.get("properties") or {}
+            # Different key (Nome zona, Nome_Zona) for Criticality end Vigilance
+            name = prop.get("Nome zona", prop.get("Nome_Zona"))
+            if not name:
+                continue
+            zone = self._zones.get(name) or self._zone(conn, name)
+            for risk, level in _zone_levels(prop).items():
+                levels.append((zone, day.isoformat(), risk, bulletin, level))
+            # Different key (Comuni, comuni) for Criticality end Vigilance
+            for city in prop.get("Comuni", prop.get("comuni")) or []:
+                if (city.lower(), zone) not in self._members:
+                    self._members.add((city.lower(), zone))
+                    municipalities.append((city, zone))
+        conn.executemany("INSERT OR REPLACE INTO level VALUES (?, ?, ?, ?, ?)", levels)
+        conn.executemany(
+            "INSERT OR IGNORE INTO municipality VALUES (?, ?)", municipalities
+        )
+        return len(levels)
+
+    def _zone(self, conn: sqlite3.Connection, name: str) -> int:
+        conn.execute("INSERT OR IGNORE INTO zone (name) VALUES (?)", (name,))
+        zone = conn.execute("SELECT id FROM zone WHERE name = ?", (name,)).fetchone()[0]
+        self._zones[name] = zone
+        return zone
+
+    def history(
+        self,
+        zone: str = "",
+        municipality: str = "",
+        start: date | None = None,
+        end: date | None = None,
+        risk: str = "",
+    ) -> list:
+        """Return the archived levels of a zone, or of the zones of a municipality.
+
+        The levels are sorted by date, zone, risk and bulletin, and are limited
+        to the days between start and end and to one risk (level, or a risk of
+        the criticality) when given.
+        """
+        with self._lock:
+            conn = self._connect()
+            if municipality:
+                zones = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT zone FROM municipality WHERE name = ?", (municipality,)
+                    )
+                ]
+            else:
+                zones = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT id FROM zone WHERE name = ?", (zone,)
+                    )
+                ]
+            if not zones:
+                return []
+            params = zones + [
+                (start or date.min).isoformat(),
+                (end or date.max).isoformat(),
+            ]
+            if risk:
+                params.append(risk)
+            query = QUERY_HISTORY.format(
+                zones=", ".join("?" * len(zones)),
+                risk=" AND l.risk = ?" if risk else "",
+            )
+            rows = conn.execute(query, params).fetchall()
+        return [
+            {
+                "kind": kind,
+                "bulletin": bulletin,
+                "date": day,
+                "zone": name,
+                "risk": column,
+                "level": level,
+            }
+            for kind, bulletin, day, name, column, level in rows
+        ]
@@ -0,0 +1,115 @@
+"""Import the bulletins of local clones of the DPC repositories into the archive.
+
+    python -m core.backfill [--archive dpc_archive.db]
+        [--workers 4] [--batch 200] DIR [DIR ...]
+
+with custom_components/dpc on PYTHONPATH, like python -m core.
+
+Every DIR is walked for the files of zones of files/geojson/ (the phenomena
+are not archived). The files are decoded in a process pool and written in
+batches, one transaction per batch. The bulletins already in the archive are
+skipped before decoding them, so a run on an updated clone only imports the
+new bulletins.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .archive import ARCHIVE_FILE, BulletinArchive, archive_key
+from .const import LOGGER
+from .jsondecode import loads
+
+BATCH = 200
+
+
+def find_bulletins(roots: list, skip: set = frozenset()) -> list:
+    """Return (key, path) of the files of zones under roots, without the keys in skip."""
+    found = {}
+    for root in roots:
+        for path in sorted(Path(root).rglob("*.json")):
+            key = archive_key(path.name)
+            if key is not None and key not in skip:
+                found.setdefault(key, path)
+    return sorted(found.items())
+
+
+def load_zones(path: Path) -> list | None:
+    """Return the features of a file with their properties only, None if not valid."""
+    try:
+        geojs = loads(path.read_bytes())
+        return [{"properties": feature["properties"]} for feature in geojs["features"]]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        LOGGER.warning("Skipped %s - %s", path, e)
+        return None
+
+
+def backfill(
+    roots: list,
+    archive: BulletinArchive,
+    workers: int | None = None,
+    batch: int = BATCH,
+) -> dict:
+    """Import the bulletins under roots not yet archived. Return the statistics."""
+    start = time.perf_counter()
+    bulletins = find_bulletins(roots, archive.keys())
+    imported = levels = failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        # The geometries are dropped in the workers, only the properties travel
+        paths = [path for _, path in bulletins]
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 8))
+        for (key, _), features in zip(
+            bulletins, pool.map(load_zones, paths, chunksize=chunksize)
+        ):
+            if features is None:
+                failed += 1
+                continue
+            pending.append((*key, features))
+            if len(pending) >= batch:
+                levels += archive.record_many(pending)
+                imported += len(pending)
+                pending = []
+        if pending:
+            levels += archive.record_many(pending)
+            imported += len(pending)
+    elapsed = time.perf_counter() - start
+    return {
+        "new": len(bulletins),
+        "imported": imported,
+        "failed": failed,
+        "levels": levels,
+        "seconds": round(elapsed, 3),
+        "bulletins_per_second": round(imported / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m core.backfill",
+        description="Import local clones of the DPC repositories into the archive.",
+    )
+    parser.add_argument("roots", nargs="+", type=Path, help="clones or files/geojson/")
+    parser.add_argument("--archive", type=Path, default=Path(ARCHIVE_FILE))
+    parser.add_argument("--workers", type=int, help="processes (default the CPUs)")
+    parser.add_argument("--batch", type=int, default=BATCH, help="bulletins per commit")
+    args = parser.parse_args()
+
+    archive = BulletinArchive(str(args.archive))
+    try:
+        stats = backfill(args.roots, archive, args.workers, args.batch)
+    finally:
+        archive.close()
+    print(
+        f"Imported {stats['imported']} new bulletins ({stats['levels']} levels, "
+        f"{stats['failed']} failed) in {stats['seconds']:.1f} s "
+        f"({stats['bulletins_per_second']:.1f} bulletins/s) into {args.archive}"
+    )
+
+
+if __name__ == "__main__":
+    main()
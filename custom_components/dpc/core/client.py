@@ -0,0 +1,885 @@
+"""Dpc API Client."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import sqlite3
+import time as timer
+from collections.abc import MutableMapping
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple
+from urllib.parse import urlsplit
+from weakref import WeakValueDictionary
+
+import aiohttp
+import async_timeout
+
+from .const import (
+    ATTR_AFTERTOMORROW,
+    ATTR_LAST_UPDATE,
+    ATTR_PHENOMENA,
+    ATTR_TODAY,
+    ATTR_TOMORROW,
+    CRIT_API_URL,
+    CRIT_BULLETIN_URL,
+    CRIT_IMAGE_URL,
+    CRIT_PATTERN_URL,
+    CRITICALITY,
+    DOMANI,
+    DOPODOMANI,
+    ENDPOINT_CRIT_GEOJSON,
+    ENDPOINT_CRIT_SITE,
+    ENDPOINT_VIGI_GEOJSON,
+    ENDPOINT_VIGI_SITE,
+    ENDPOINTS,
+    LOGGER,
+    METRIC_BYTES,
+    METRIC_LATENCY,
+    METRIC_LOOP_TIME,
+    METRIC_REFRESH_DURATION,
+    METRIC_RETRIES,
+    OGGI,
+    REGEX_DPC_DATE,
+    REGEX_DPC_ID,
+    REGEX_DPC_ID_DATETIME,
+    RISKS,
+    TIMEOUT,
+    VIGI_API_URL,
+    VIGI_BULLETIN_URL,
+    VIGI_IMAGE_URL,
+    VIGI_PATTERN_URL,
+    VIGILANCE,
+)
+from .archive import BulletinArchive, archive_key
+from .endpoints import (
+    CONTENTS_API_HEADERS,
+    EndpointPool,
+    LatencyTracker,
+    contents_api_url,
+    redact_url,
+)
+from .github import GITHUB_API_HOST, RateLimitBudget
+from .index import (
+    PhenomenaIndex,
+    ZoneIndex,
+    _bbox_distance,
+    _circle_window,
+    _tangent_plane,
+)
+from .jsondecode import loads
+from .parsers import (
+    get_info_level,
+    get_phenomena,
+    get_properties,
+    parse_criticality,
+    parse_vigilance,
+)
+from .stream import load_features
+
+
+class Target(NamedTuple):
+    """A location resolved by DpcApiClient.resolve_many."""
+
+    name: str
+    latitude: float
+    longitude: float
+    municipality: str = ""
+    radius: float | None = None
+
+
+class DpcApiClient:
+    def __init__(
+        self,
+        location_name: str,
+        latitude: float,
+        longitude: float,
+        municipality: str,
+        radius: int,
+        session: aiohttp.ClientSession,
+        update_interval: timedelta,
+        radius_zones: bool = False,
+        simplify_tolerance: float = 0,
+        phenomena_limit: int = 0,
+        phenomena_dedup: bool = False,
+        archive: BulletinArchive | None = None,
+        mirrors: list | None = None,
+        hedged: bool = False,
+        github_api: bool = False,
+        github: RateLimitBudget | None = None,
+        stream_parse: bool = False,
+        indexes: MutableMapping | None = None,
+    ) -> None:
+        """Dpc API Client.
+
+        With radius_zones the levels are the highest of all the zones within
+        radius, not of the zone of the location only. With simplify_tolerance
+        (m) the zones are simplified once per bulletin before any lookup. With
+        phenomena_limit and phenomena_dedup the phenomena are the nearest ones,
+        only one per type with dedup, sorted by distance. With an archive the
+        zones of every bulletin fetched are recorded in it. With mirrors (base
+        urls) every url is fetched from the mirrors first, then the upstream.
+        With hedged, when a source is slower than the p95 latency of its
+        endpoint the next one is started too (with the GitHub contents API
+        after raw GitHub), and the first answer wins. With github_api the ids
+        of the bulletins are listed by the GitHub API, within the budget github
+        of its rate limit (shared by the clients of a token), else scraped.
+        With stream_parse only the geometries of the zones and phenomena of
+        the location are decoded, so other points cannot be resolved. Else the
+        decoded bulletins and their indexes are shared by url with the clients
+        of the same indexes (a WeakValueDictionary), so many locations keep one
+        copy of every bulletin.
+        """
+        self._name = location_name
+        self._latitude = latitude
+        self._longitude = longitude
+        self._municipality = municipality
+        self._radius = radius
+        self._session = session
+        self._interval = update_interval
+        self._radius_zones = radius_zones
+        self._simplify_tolerance = simplify_tolerance
+        self._phenomena_limit = phenomena_limit
+        self._phenomena_dedup = phenomena_dedup
+        self._archive = archive
+        self._endpoints = EndpointPool(mirrors)
+        self._hedged = hedged
+        self._latency = LatencyTracker()
+        self._github_api = github_api
+        self._github = github or RateLimitBudget()
+        self._stream_parse = stream_parse
+        self._shared_indexes = WeakValueDictionary() if indexes is None else indexes
+
+        self._data = {}
+        self._id_crit = None
+        self._id_vigi = None
+        self._pending_full_update = False
+        self._pub_date_crit = None
+        self._pub_date_vigi = None
+        self._point = {"type": "Point", "coordinates": [longitude, latitude]}
+        self._urls_crit = []
+        self._urls_vigi = []
+        # Indexes of the decoded bulletins by url, kept to resolve other locations
+        self._indexes = {CRITICALITY: {}, VIGILANCE: {}}
+        self._swaps = {CRITICALITY: 0, VIGILANCE: 0}
+        self._metrics = {
+            METRIC_BYTES: None,
+            METRIC_LATENCY: {endpoint: None for endpoint in ENDPOINTS},
+            METRIC_LOOP_TIME: None,
+            METRIC_REFRESH_DURATION: None,
+            METRIC_RETRIES: 0,
+        }
+
+    @property
+    def metrics(self) -> dict:
+        """Performance metrics of the last refresh."""
+        return self._metrics
+
+    @property
+    def endpoints(self) -> EndpointPool:
+        """Mirrors of the upstream urls and their health."""
+        return self._endpoints
+
+    @property
+    def latency(self) -> LatencyTracker:
+        """Latencies of the last fetches by endpoint."""
+        return self._latency
+
+    @property
+    def github(self) -> RateLimitBudget:
+        """Budget of the requests to the GitHub API."""
+        return self._github
+
+    @property
+    def streamed(self) -> bool:
+        """Whether only the geometries of the location are decoded."""
+        return self._stream_parse
+
+    async def async_get_data(self) -> dict:
+        """Get data from the API."""
+        start = timer.perf_counter()
+        self._metrics[METRIC_BYTES] = 0
+        self._metrics[METRIC_LOOP_TIME] = 0.0
+        try:
+            return await self._async_get_data()
+        finally:
+            self._metrics[METRIC_REFRESH_DURATION] = round(
+                (timer.perf_counter() - start) * 1000, 1
+            )
+            self._metrics[METRIC_LOOP_TIME] = round(self._metrics[METRIC_LOOP_TIME], 1)
+            if self._pending_full_update:
+                self._metrics[METRIC_RETRIES] += 1
+            else:
+                self._metrics[METRIC_RETRIES] = 0
+
+    async def _async_get_data(self) -> dict:
+        """Fetch the bulletin ids and update the data if needed."""
+        ids = [self.get_id_from_api(CRITICALITY), self.get_id_from_api(VIGILANCE)]
+        ids_result = await asyncio.gather(*ids)
+        new_id_crit, new_id_vigi = ids_result
+        LOGGER.debug(
+            "[%s] IDS: CRIT %s - VIGI %s", self._name, new_id_crit, new_id_vigi
+        )
+
+        if not any(ids_result):
+            LOGGER.debug("ERROR! No IDs fetched")
+            self._pending_full_update = True
+            return self._data or {}
+
+        now = datetime.now()
+        midnight = datetime.combine(now.date(), time())
+        midnight_first_update = midnight + self._interval
+        between_midnight_first_update = bool(midnight <= now <= midnight_first_update)
+        date_today = date.today()
+        is_swap_criticality = False
+        is_swap_vigilance = False
+
+        if new_id_crit:
+            if self._id_crit != new_id_crit:
+                self._data[CRITICALITY] = {}
+                self._urls_crit = []
+                self._indexes[CRITICALITY] = {}
+                self._swaps[CRITICALITY] = 0
+                self._id_crit = new_id_crit
+                self._pub_date_crit = datetime.strptime(self._id_crit, "%Y%m%d_%H%M")
+
+                criticality_days = ["today", "tomorrow"]
+                if date_today != self._pub_date_crit.date():
+                    is_swap_criticality = True
+                    criticality_days.remove("today")
+                for day in criticality_days:
+                    self._urls_crit.append(CRIT_PATTERN_URL.format(self._id_crit, day))
+            elif between_midnight_first_update:
+                self.swapping_data_criticality()
+            else:
+                LOGGER.debug(
+                    "[%s] Criticality No changes. %s", self._name, self._id_crit
+                )
+
+        if new_id_vigi:
+            if self._id_vigi != new_id_vigi:
+                self._data[VIGILANCE] = {}
+                self._urls_vigi = []
+                self._indexes[VIGILANCE] = {}
+                self._swaps[VIGILANCE] = 0
+                self._id_vigi = new_id_vigi
+                self._pub_date_vigi = datetime.strptime(self._id_vigi, "%Y%m%d")
+
+                vigilance_days = [OGGI, DOMANI, DOPODOMANI]
+                if date_today != self._pub_date_vigi.date():
+                    is_swap_vigilance = True
+                    vigilance_days.remove(OGGI)
+                for day in vigilance_days:
+                    self._urls_vigi.extend(
+                        (
+                            VIGI_PATTERN_URL.format(self._id_vigi, day),
+                            VIGI_PATTERN_URL.format(self._id_vigi, f"fenomeni_{day}"),
+                        )
+                    )
+            elif between_midnight_first_update:
+                self.swapping_data_vigilance()
+            else:
+                LOGGER.debug("[%s] Vigilance No changes. %s", self._name, self._id_vigi)
+
+        urls = self._urls_crit + self._urls_vigi
+        if urls:
+            await self.multi_fetch(urls)
+
+            if is_swap_criticality:
+                self.swapping_data_criticality()
+            if is_swap_vigilance:
+                self.swapping_data_vigilance()
+
+        if new_id_crit and self._data[CRITICALITY]:
+            self._data[CRITICALITY][ATTR_LAST_UPDATE] = now.isoformat()
+        if new_id_vigi and self._data[VIGILANCE]:
+            self._data[VIGILANCE][ATTR_LAST_UPDATE] = now.isoformat()
+
+        self._pending_full_update = self.requires_full_update()
+        return self._data
+
+    async def get_id_from_api(self, bulletin: str) -> str | None:
+        """Get the id from the API otherwise from the site. Param 'criticality' or 'vigilance'.
+
+        The GitHub API is asked only with github_api and within the budget of
+        its rate limit, the site is scraped otherwise.
+        """
+        if self._github_api:
+            url = {CRITICALITY: CRIT_API_URL, VIGILANCE: VIGI_API_URL}[bulletin]
+            resp = await self.api_fetch(url, decode=False)
+            id = self.parse_api_id(bulletin, resp.get(url, b""))
+            if id:
+                LOGGER.debug(
+                    "[%s] From the Github API I got %s ID: %s", self._name, bulletin, id
+                )
+                return id
+        return await self.get_id_from_site(bulletin)
+
+    def parse_api_id(self, bulletin: str, data: bytes) -> str | None:
+        """Return the last id of today or yesterday in a listing of the GitHub API."""
+        try:
+            names = [item["name"] for item in loads(data)]
+        except (ValueError, TypeError, KeyError):
+            return None
+        regex = REGEX_DPC_DATE if VIGILANCE in bulletin else REGEX_DPC_ID_DATETIME
+        days = self.format_date_filename()
+        ids = [
+            match.group(0)
+            for match in map(regex.match, names)
+            if match and match.group(0).startswith(days)
+        ]
+        return max(ids, default=None)
+
+    def format_date_filename(self):
+        """Returns today's and yesterday's date in string file name format."""
+        date_today = date.today()
+        date_yesterday = date_today - timedelta(days=1)
+        date_str_today = date_today.strftime("%Y%m%d")
+        date_str_yesterday = date_yesterday.strftime("%Y%m%d")
+        return date_str_today, date_str_yesterday
+
+    async def get_id_from_site(self, bulletin: str) -> str | None:
+        """Get the id from the site using regex."""
+        id = None
+        site_endpoint = {CRITICALITY: CRIT_BULLETIN_URL, VIGILANCE: VIGI_BULLETIN_URL}
+        url = site_endpoint.get(bulletin)
+        resp = await self.api_fetch(url)
+        html = resp.get(url, "")
+        start = timer.perf_counter()
+        if VIGILANCE in bulletin:
+            id_pub = [match[0] for match in REGEX_DPC_ID.findall(html)]
+        else:
+            id_pub = REGEX_DPC_ID_DATETIME.findall(html)
+        if id_pub:
+            id = id_pub[0]
+            LOGGER.debug("[%s] From the SITE I got %s ID: %s", self._name, bulletin, id)
+        self._add_loop_time(start)
+        return id
+
+    async def api_fetch(self, url: str, decode: bool = True) -> dict:
+        """Get information from the API, from the first source answering.
+
+        Without decode the body is the bytes, for jsondecode.loads to decode
+        them without an intermediate str.
+        """
+        fetched = {}
+        try:
+            start = timer.perf_counter()
+            result = await self._fetch(url)
+            if result is not None:
+                body, encoding = result
+                fetched = {url: body.decode(encoding) if decode else body}
+                elapsed = timer.perf_counter() - start
+                self._latency.add(self.get_endpoint(url), elapsed)
+                self._metrics[METRIC_LATENCY][self.get_endpoint(url)] = round(
+                    elapsed * 1000, 1
+                )
+                self._metrics[METRIC_BYTES] += len(body)
+
+        except asyncio.CancelledError as e:
+            LOGGER.error("Cancelled error fetching information from %s - %s", url, e)
+
+        except (KeyError, TypeError) as e:
+            LOGGER.error("Error parsing information from %s - %s", url, e)
+
+        except Exception as unexpected_error:  # pylint: disable=broad-except
+            LOGGER.exception(
+                "Unexpected error exception occured for %s:  %s",
+                url,
+                getattr(unexpected_error, "__dict__", {}),
+            )
+
+        finally:
+            return fetched
+
+    async def api_fetch_bytes(self, url: str) -> bytes | None:
+        """Get a file from the API as bytes, None on errors."""
+        result = await self._fetch(url)
+        return None if result is None else result[0]
+
+    def _sources(self, url: str) -> list:
+        """Return the (mirror, url, headers) to fetch url from, in order."""
+        sources = [
+            (mirror, source, None) for mirror, source in self._endpoints.urls(url)
+        ]
+        api_url = contents_api_url(url)
+        if self._hedged and api_url:
+            # After the upstream, before the mirrors in cooldown
+            upstream = next(
+                i for i, (mirror, *_) in enumerate(sources) if mirror is None
+            )
+            sources.insert(upstream + 1, (None, api_url, CONTENTS_API_HEADERS))
+        return sources
+
+    async def _fetch(self, url: str) -> tuple[bytes, str] | None:
+        """Return the body and its encoding from the first source answering."""
+        sources = self._sources(url)
+        if self._hedged:
+            return await self._hedged_fetch(url, sources)
+        for source in sources:
+            result = await self._get(*source)
+            if result is not None:
+                return result
+        return None
+
+    async def _hedged_fetch(self, url: str, sources: list) -> tuple[bytes, str] | None:
+        """Return the first answer of the sources, started in order.
+
+        The next source is started when the ones started fail, or have not
+        answered within the p95 latency of the endpoint. The sources still
+        running are cancelled once one answers.
+        """
+        delay = self._latency.delay(self.get_endpoint(url))
+        pending = set()
+        try:
+            for position, source in enumerate(sources):
+                pending.add(asyncio.ensure_future(self._get(*source)))
+                done, pending = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.result() is not None:
+                        return task.result()
+                if not done and position + 1 < len(sources):
+                    LOGGER.debug(
+                        "[%s] No answer from %s in %.0f ms, hedging with %s",
+                        self._name,
+                        redact_url(source[1]),
+                        delay * 1000,
+                        redact_url(sources[position + 1][1]),
+                    )
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.result() is not None:
+                        return task.result()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _get(
+        self, mirror: str | None, source: str, headers: dict | None
+    ) -> tuple[bytes, str] | None:
+        """Return the body of source and its encoding, None on errors.
+
+        The requests to the GitHub API are sent only within its budget, with
+        the token and the ETag of the last answer.
+        """
+        github = urlsplit(source).netloc == GITHUB_API_HOST
+        if github:
+            if not self._github.acquire():
+                LOGGER.debug("[%s] Over the GitHub API budget: %s", self._name, source)
+                return None
+            headers = {**self._github.headers(source), **(headers or {})}
+        try:
+            async with async_timeout.timeout(TIMEOUT):
+                r = await self._session.get(
+                    source, headers=headers, raise_for_status=True
+                )
+                body = await r.read()
+            self._endpoints.mark_ok(mirror)
+            if github:
+                self._github.update(r.headers, r.status)
+                if r.status == 304:
+                    return self._github.cached(source)
+                self._github.store(
+                    source, r.headers.get("ETag"), body, r.get_encoding()
+                )
+            return body, r.get_encoding()
+
+        except asyncio.TimeoutError as e:
+            LOGGER.error(
+                "Timeout error fetching information from %s [%s] - %s",
+                redact_url(source),
+                TIMEOUT,
+                e,
+            )
+
+        except aiohttp.ClientResponseError as e:
+            LOGGER.error(
+                "Error fetching information from %s - %s", redact_url(source), e
+            )
+            if github:
+                self._github.update(e.headers or {}, e.status)
+            if e.status < 500:
+                return None  # Not synced yet, the mirror is healthy
+
+        except (aiohttp.ClientError, socket.gaierror) as e:
+            LOGGER.error(
+                "Error fetching information from %s - %s", redact_url(source), e
+            )
+
+        self._endpoints.mark_failed(mirror)
+        return None
+
+    async def multi_fetch(self, urls: list) -> list:
+        """Fetching responses for multiple urls."""
+        return await asyncio.gather(*[self.fetch_and_parse(url) for url in urls])
+
+    async def fetch_and_parse(self, url: str) -> dict:
+        try:
+            result = await self.api_fetch(url, decode=False)
+            if result:
+                start = timer.perf_counter()
+                try:
+                    response = self.load_bulletin(url, result.get(url))
+                    if "Vigilanza-Meteorologica" in url:
+                        await self.get_vigilance(url, response)
+                    else:  # "Criticita-Idrogeologica" in url:
+                        await self.get_criticality(url, response)
+                finally:
+                    self._add_loop_time(start)
+                await self.archive_bulletin(url, response)
+
+        except ValueError as e:  # Malformed JSON
+            LOGGER.warning("[%s] Error decoding DPC Data [%s]", self._name, e)
+
+        except Exception as e:
+            LOGGER.warning("[%s] fetch and parse: [%s]", self._name, e)
+
+    def load_bulletin(self, url: str, data: bytes) -> dict:
+        """Return a bulletin decoded, with stream_parse only the geometries needed.
+
+        The zones kept are the ones of the municipality, and the ones whose
+        bbox holds the point or is within radius with radius_zones; the
+        phenomena the ones whose bbox is within the circle of radius. A point
+        in no zone needs the nearest one: the whole bulletin is decoded.
+        """
+        if not self._stream_parse:
+            # The files of a bulletin never change: its url holds its id
+            shared = self._shared_indexes.get(self._index_key(url))
+            return loads(data) if shared is None else shared.geojs
+        bulletin = VIGILANCE if "Vigilanza-Meteorologica" in url else CRITICALITY
+        if "_fenomeni" in url:
+            return load_features(data, self._keep_phenomenon)
+        start = timer.perf_counter()
+        geojs = load_features(data, self._keep_zone)
+        index = self.get_index(bulletin, url, geojs)
+        kept = sum(feature["geometry"] is not None for feature in geojs["features"])
+        LOGGER.debug(
+            "[%s] Streamed %s of %s zones of %s in %.1f ms",
+            self._name,
+            kept,
+            len(index),
+            url.split("geojson/")[-1],
+            (timer.perf_counter() - start) * 1000,
+        )
+        if (
+            self._municipality and self._municipality in index.municipalities
+        ) or index.find(self._point) is not None:
+            return geojs
+        LOGGER.debug("[%s] Not point in the zones streamed, decoding all", self._name)
+        return loads(data)
+
+    def _keep_zone(self, feature: dict, kind: str, bbox: list | None) -> bool:
+        longitude, latitude = self._point["coordinates"]
+        if bbox is None:
+            return True
+        if bbox[0] <= latitude <= bbox[2] and bbox[1] <= longitude <= bbox[3]:
+            return True
+        if self._radius_zones and self._radius:
+            plane = _tangent_plane(self._point)
+            if _bbox_distance(bbox, plane) <= self._radius * 1000:
+                return True
+        if not self._municipality:
+            return False
+        prop = feature.get("properties") or {}
+        # Different key (Comuni, comuni) for Criticality end Vigilance
+        comuni = prop.get("Comuni", prop.get("comuni")) or []
+        return self._municipality.lower() in (city.lower() for city in comuni)
+
+    def _keep_phenomenon(self, feature: dict, kind: str, bbox: list | None) -> bool:
+        if kind not in ("Point", "LineString", "Polygon") or bbox[0] > bbox[2]:
+            return True  # Always within radius for geometry_within_radius
+        longitude, latitude = self._point["coordinates"]
+        window = _circle_window(longitude, latitude, self._radius * 1000)
+        if window is None:
+            return True
+        max_lat, max_lon = window
+        return (
+            bbox[0] >= latitude - max_lat
+            and bbox[2] <= latitude + max_lat
+            and bbox[1] >= longitude - max_lon
+            and bbox[3] <= longitude + max_lon
+        )
+
+    async def archive_bulletin(self, url: str, geojs: dict) -> None:
+        """Record the zones of a bulletin in the archive, in the executor."""
+        key = archive_key(url.rsplit("/", 1)[-1])
+        if self._archive is None or key is None:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._archive.record, *key, geojs["features"]
+            )
+        except sqlite3.Error as e:
+            LOGGER.warning("[%s] Error archiving %s - %s", self._name, url, e)
+
+    async def get_criticality(self, url: str, response: dict) -> dict:
+        short_url = url.split("geojson/")[1]
+        LOGGER.debug("[%s] Criticality Update %s", self._name, short_url)
+        expiration_date = datetime.combine(self._pub_date_crit, datetime.min.time())
+
+        if "today" in url:
+            day_en = ATTR_TODAY
+            day_it = OGGI
+        else:
+            day_en = ATTR_TOMORROW
+            day_it = DOMANI
+            expiration_date += timedelta(days=1)
+
+        image_crit = CRIT_IMAGE_URL.format(self._id_crit, day_it)
+        criticality = self._data.get(CRITICALITY, {})
+
+        try:
+            index = self.get_index(CRITICALITY, url, response)
+            prop = self.get_properties(self._municipality, self._point, response, index)
+            criticality.update(
+                parse_criticality(
+                    prop,
+                    self._id_crit,
+                    self._pub_date_crit,
+                    day_en,
+                    day_it,
+                    image_crit,
+                    expiration_date,
+                )
+            )
+
+            self._urls_crit.remove(url)
+
+        except Exception as exception:
+            LOGGER.error("Criticality Exception! - %s", exception)
+            pass
+
+    async def get_vigilance(self, url: str, response: dict) -> dict:
+        short_url = url.split("geojson/")[1]
+        LOGGER.debug("[%s] Vigilance Update %s", self._name, short_url)
+
+        if "_oggi" in url:
+            day_en = ATTR_TODAY
+            image_vigi = VIGI_IMAGE_URL.format(self._id_vigi, OGGI)
+        elif "_domani" in url:
+            day_en = ATTR_TOMORROW
+            image_vigi = VIGI_IMAGE_URL.format(self._id_vigi, DOMANI)
+        else:  # "_dopodomani" in url:
+            day_en = ATTR_AFTERTOMORROW
+            image_vigi = None
+
+        vigilance = self._data.get(VIGILANCE, {})
+        vigilance[day_en] = vigilance.get(day_en, {})
+
+        try:
+            index = self.get_index(VIGILANCE, url, response)
+            if "_fenomeni" in url:
+                phenomena = self.get_phenomena(self._point, response, index)
+                vigilance[day_en].update({ATTR_PHENOMENA: phenomena})
+
+            else:  # "Vigilanza-Meteorologica" in url:
+                prop = self.get_properties(
+                    self._municipality, self._point, response, index
+                )
+                header, day = parse_vigilance(
+                    prop, self._id_vigi, self._pub_date_vigi, image_vigi
+                )
+                vigilance.update(header)
+                vigilance[day_en].update(day)
+
+            self._urls_vigi.remove(url)
+
+        except Exception as exception:
+            LOGGER.error("Vigilance Exception! - %s", exception)
+            pass
+
+    def _add_loop_time(self, start: float) -> None:
+        """Add the time spent blocking the event loop since start, in ms."""
+        self._metrics[METRIC_LOOP_TIME] += (timer.perf_counter() - start) * 1000
+
+    @staticmethod
+    def get_endpoint(url: str) -> str:
+        """Return the metrics endpoint of an url."""
+        if url in (CRIT_BULLETIN_URL, CRIT_API_URL):
+            return ENDPOINT_CRIT_SITE
+        if url in (VIGI_BULLETIN_URL, VIGI_API_URL):
+            return ENDPOINT_VIGI_SITE
+        if "Vigilanza-Meteorologica" in url:
+            return ENDPOINT_VIGI_GEOJSON
+        return ENDPOINT_CRIT_GEOJSON
+
+    def get_index(
+        self, bulletin: str, url: str, geojs: dict
+    ) -> ZoneIndex | PhenomenaIndex:
+        """Return the index of a decoded bulletin, building it the first time."""
+        index = self._indexes[bulletin].get(url)
+        if (index is None or index.geojs is not geojs) and not self._stream_parse:
+            index = self._shared_indexes.get(self._index_key(url))
+        if index is None or index.geojs is not geojs:
+            start = timer.perf_counter()
+            if "_fenomeni" in url:
+                index = PhenomenaIndex(geojs)
+            else:
+                index = ZoneIndex(geojs, self._simplify_tolerance)
+            if not self._stream_parse:
+                self._shared_indexes[self._index_key(url)] = index
+            LOGGER.debug(
+                "[%s] Indexed %s features of %s in %.1f ms",
+                self._name,
+                len(index),
+                url.split("geojson/")[-1],
+                (timer.perf_counter() - start) * 1000,
+            )
+        self._indexes[bulletin][url] = index
+        return index
+
+    def _index_key(self, url: str) -> tuple[str, float]:
+        """Return the key of the index of url shared by the clients."""
+        return url, 0 if "_fenomeni" in url else self._simplify_tolerance
+
+    def get_zones(self, bulletin: str, day: date) -> tuple[str, ZoneIndex, list] | None:
+        """Return the bulletin id, the index and the zones of the location for a day.
+
+        The zones are the ones the levels come from. None if no bulletin of
+        zones for the day is loaded.
+        """
+        radius = self._radius * 1000 if self._radius_zones else 0
+        for url, index in self._indexes[bulletin].items():
+            key = archive_key(url.rsplit("/", 1)[-1])
+            if key is None or key[2] != day or not isinstance(index, ZoneIndex):
+                continue
+            return key[1], index, index.locate(self._point, self._municipality, radius)
+        return None
+
+    async def resolve_many(self, targets: list) -> list:
+        """Resolve many locations against the bulletins of the last update.
+
+        The bulletins are decoded and indexed once by async_get_data; every
+        Target only pays for its lookups. Return the data of each target, in
+        the same form and order of async_get_data.
+        """
+        results = []
+        for target in targets:
+            target = Target(*target)
+            client = DpcApiClient(
+                target.name,
+                target.latitude,
+                target.longitude,
+                target.municipality,
+                self._radius if target.radius is None else target.radius,
+                self._session,
+                self._interval,
+                self._radius_zones,
+                self._simplify_tolerance,
+                self._phenomena_limit,
+                self._phenomena_dedup,
+            )
+            client._data = {CRITICALITY: {}, VIGILANCE: {}}
+            client._id_crit, client._pub_date_crit = self._id_crit, self._pub_date_crit
+            client._id_vigi, client._pub_date_vigi = self._id_vigi, self._pub_date_vigi
+            client._indexes = self._indexes
+
+            for url, index in self._indexes[CRITICALITY].items():
+                client._urls_crit.append(url)
+                await client.get_criticality(url, index.geojs)
+            for url, index in self._indexes[VIGILANCE].items():
+                client._urls_vigi.append(url)
+                await client.get_vigilance(url, index.geojs)
+            for _ in range(self._swaps[CRITICALITY]):
+                client.swapping_data_criticality()
+            for _ in range(self._swaps[VIGILANCE]):
+                client.swapping_data_vigilance()
+
+            for bulletin in (CRITICALITY, VIGILANCE):
+                last_update = self._data.get(bulletin, {}).get(ATTR_LAST_UPDATE)
+                if last_update and client._data[bulletin]:
+                    client._data[bulletin][ATTR_LAST_UPDATE] = last_update
+            results.append(client._data)
+        return results
+
+    def get_municipality(self, municipality: str) -> dict | None:
+        """Return the max levels of the zones of a municipality, by bulletin file.
+
+        None if no loaded bulletin lists the municipality.
+        """
+        result = {}
+        for bulletin, indexes in self._indexes.items():
+            for url, index in indexes.items():
+                if not isinstance(index, ZoneIndex):
+                    continue
+                levels = index.municipalities.levels(municipality)
+                if levels is not None:
+                    file_name = url.rsplit("/", 1)[-1].removesuffix(".json")
+                    result.setdefault(bulletin, {})[file_name] = levels
+        return result or None
+
+    def has_municipality(self, municipality: str) -> bool | None:
+        """Return whether the loaded bulletins list a municipality.
+
+        None if no bulletin of zones is loaded.
+        """
+        tables = [
+            index.municipalities
+            for indexes in self._indexes.values()
+            for index in indexes.values()
+            if isinstance(index, ZoneIndex)
+        ]
+        if not tables:
+            return None
+        return any(municipality in table for table in tables)
+
+    get_info_level = staticmethod(get_info_level)
+
+    def get_properties(self, comune_conf, point, geojs, index=None) -> dict:
+        radius = self._radius if self._radius_zones else 0
+        return get_properties(geojs, point, comune_conf, self._name, index, radius)
+
+    def get_phenomena(self, point, geojs, index=None) -> list:
+        return get_phenomena(
+            geojs,
+            point,
+            self._radius,
+            index,
+            self._phenomena_limit,
+            self._phenomena_dedup,
+        )
+
+    def swapping_data_criticality(self):
+        swap_data = self._data.get(CRITICALITY, {})
+        if swap_data:
+            for risk in RISKS:
+                day_0 = f"{risk}_{OGGI}"
+                day_1 = f"{risk}_{DOMANI}"
+                swap_data[day_0] = swap_data.get(day_1, {})
+                swap_data[day_1] = {}
+            swap_data[ATTR_TODAY] = swap_data.get(ATTR_TOMORROW, {})
+            swap_data.pop(ATTR_TOMORROW, None)
+            self._data[CRITICALITY] = swap_data
+            self._swaps[CRITICALITY] += 1
+            LOGGER.debug("[%s] Swapped data for Criticality", self._name)
+
+    def swapping_data_vigilance(self):
+        swap_data = self._data.get(VIGILANCE, {})
+        if swap_data:
+            swap_data[ATTR_TODAY] = swap_data.get(ATTR_TOMORROW, {})
+            swap_data[ATTR_TOMORROW] = swap_data.get(ATTR_AFTERTOMORROW, {})
+            swap_data.pop(ATTR_AFTERTOMORROW, None)
+            self._data[VIGILANCE] = swap_data
+            self._swaps[VIGILANCE] += 1
+            LOGGER.debug("[%s] Swapped data for Vigilance", self._name)
+
+    def requires_full_update(self) -> bool:
+        pending_update = (
+            not self._data[CRITICALITY],
+            not self._data[VIGILANCE],
+            self._urls_crit,
+            self._urls_vigi,
+        )
+        return True if any(pending_update) else False
+
+
+class DpcApiException(Exception):
+    """Base Exception for Dpc error."""
+
+    pass
@@ -0,0 +1,231 @@
+"""Constants for Dpc, free of Home Assistant imports."""
+
+import logging
+import re
+
+LOGGER = logging.getLogger(__package__)
+
+# Base component constants
+ATTRIBUTION = "Data provided by Civil Protection Department"
+DOMAIN = "dpc"
+ISSUE_URL = (
+    "https://github.com/caiosweet/Home-Assistant-custom-components-DPC-Alert/issues"
+)
+NAME = "Dipartimento Protezione Civile"
+MANUFACTURER = "Italian Government"
+VERSION = "2026.1.2"
+
+# Config
+CONF_ARCHIVE = "archive"
+CONF_CLEAR_GITHUB_TOKEN = "clear_github_token"
+CONF_CLEAR_MIRRORS = "clear_mirrors"
+CONF_GITHUB_API = "github_api"
+CONF_GITHUB_TOKEN = "github_token"
+CONF_HEDGED_FETCH = "hedged_fetch"
+CONF_MIRRORS = "mirrors"
+CONF_MUNICIPALITY = "municipality"
+CONF_PHENOMENA_DEDUP = "phenomena_dedup"
+CONF_PHENOMENA_LIMIT = "phenomena_limit"
+CONF_RADIUS_ZONES = "radius_zones"
+CONF_SIMPLIFY_TOLERANCE = "simplify_tolerance"
+CONF_STREAM_PARSE = "stream_parse"
+CONF_WARNING_LEVEL = "warning_level"
+
+# Defaults
+DEFAULT_NAME = "DPC"
+DEFAULT_WARNING_LEVEL = 2
+DEFAULT_RADIUS = 50  # Km
+DEFAULT_SCAN_INTERVAL = 30  # min
+
+WARNING_ALERT = {
+    "NESSUNA ALLERTA": 1,
+    "ALLERTA GIALLA": 2,
+    "ALLERTA ARANCIONE": 3,
+    "ALLERTA ROSSA": 4,
+}
+
+
+WARNING_TYPES = [
+    "idraulico_oggi",
+    "temporali_oggi",
+    "idrogeologico_oggi",
+    "idraulico_domani",
+    "temporali_domani",
+    "idrogeologico_domani",
+]
+
+STARTUP_MESSAGE = f"""
+-------------------------------------------------------------------
+{NAME}
+Version: {VERSION}
+This is a custom integration!
+If you have any issues with this you need to open an issue here:
+{ISSUE_URL}
+-------------------------------------------------------------------
+"""
+
+ATTR_AFTERTOMORROW = "aftertomorrow"
+ATTR_ALERT = "alert"
+ATTR_ID = "id"
+ATTR_EXPIRES = "expires"
+ATTR_EVENTS_TODAY = "events_today"
+ATTR_EVENTS_TOMORROW = "events_tomorrow"
+ATTR_IMAGE_URL = "image_url"
+ATTR_INFO = "info"
+ATTR_LAST_UPDATE = "last_update"
+ATTR_LEVEL = "level"
+ATTR_LINK = "link"
+ATTR_MAX_LEVEL = "max_level"
+ATTR_MUNICIPALITY_LEVELS = "municipality_levels"
+ATTR_PHENOMENA = "phenomena"
+ATTR_PRECIPITATION = "precipitation"
+ATTR_PUBLICATION_DATE = "publication_date"
+ATTR_RISK = "risk"
+ATTR_TODAY = "today"
+ATTR_TOMORROW = "tomorrow"
+ATTR_TOTAL_ALERTS = "total_alerts"
+ATTR_TOTAL_PHENOMENA = "total_phenomena"
+ATTR_ZONE_NAME = "zone_name"
+
+# Diagnostic metrics
+METRIC_BYTES = "bytes_downloaded"
+METRIC_LATENCY = "latency"
+METRIC_LOOP_TIME = "loop_time"
+METRIC_REFRESH_DURATION = "refresh_duration"
+METRIC_RETRIES = "retries"
+
+ENDPOINT_CRIT_SITE = "criticality_site"
+ENDPOINT_CRIT_GEOJSON = "criticality_geojson"
+ENDPOINT_VIGI_SITE = "vigilance_site"
+ENDPOINT_VIGI_GEOJSON = "vigilance_geojson"
+ENDPOINTS = [
+    ENDPOINT_CRIT_SITE,
+    ENDPOINT_CRIT_GEOJSON,
+    ENDPOINT_VIGI_SITE,
+    ENDPOINT_VIGI_GEOJSON,
+]
+
+# Upstream
+CRIT_API_URL = "https://api.github.com/repos/pcm-dpc/DPC-Bollettini-Criticita-Idrogeologica-Idraulica/contents/files"
+CRIT_BULLETIN_URL = (
+    "https://mappe.protezionecivile.gov.it/it/mappe-rischi/bollettino-di-criticita/"
+)
+CRIT_IMAGE_URL = (
+    "https://raw.githubusercontent.com/pcm-dpc/DPC-Bollettini-Criticita-"
+    "Idrogeologica-Idraulica/master/files/preview/{}_{}.png"
+)
+CRIT_PATTERN_URL = (
+    "https://raw.githubusercontent.com/pcm-dpc/DPC-Bollettini-Criticita-"
+    "Idrogeologica-Idraulica/master/files/geojson/{}_{}.json"
+)
+
+VIGI_API_URL = "https://api.github.com/repos/pcm-dpc/DPC-Bollettini-Vigilanza-Meteorologica/contents/files"
+VIGI_BULLETIN_URL = (
+    "https://mappe.protezionecivile.gov.it/it/mappe-rischi/bollettino-di-vigilanza/"
+)
+VIGI_IMAGE_URL = (
+    "https://raw.githubusercontent.com/pcm-dpc/DPC-Bollettini-Vigilanza-"
+    "Meteorologica/master/files/preview/{}_{}.png"
+)
+VIGI_PATTERN_URL = (
+    "https://raw.githubusercontent.com/pcm-dpc/DPC-Bollettini-Vigilanza-"
+    "Meteorologica/master/files/geojson/{}_{}.json"
+)
+
+OGGI = "oggi"
+DOMANI = "domani"
+DOPODOMANI = "dopodomani"
+RISKS = ["idraulico", "temporali", "idrogeologico"]
+
+CRITICALITY = "criticality"
+VIGILANCE = "vigilance"
+
+DEFAULT_ICON = "mdi:hazard-lights"
+CRIT_ICON = {
+    "idraulico": "mdi:home-flood",
+    "temporali": "mdi:weather-lightning",
+    "idrogeologico": "mdi:waves",
+}
+VIGI_ICON = {
+    1: "mdi:numeric-1-circle",
+    2: "mdi:numeric-2-circle",
+    3: "mdi:numeric-3-circle",
+    4: "mdi:numeric-4-circle",
+    5: "mdi:numeric-5-circle",
+}
+PHENOMENA_ICON = {
+    1: "mdi:water",
+    2: "mdi:water-plus",
+    3: "mdi:snowflake",
+    4: "mdi:snowflake-alert",
+    5: "mdi:lightning-bolt",
+    6: "mdi:flash",
+    7: "mdi:flash-alert",
+    10: "mdi:weather-windy-variant",
+    11: "mdi:weather-windy",
+    12: "mdi:windsock",
+    13: "mdi:wind-turbine",
+    20: "mdi:image-filter-hdr",
+    21: "mdi:snowflake-variant",
+    30: "mdi:weather-fog",
+    31: "mdi:weather-hazy",
+    40: "mdi:waves",
+    41: "mdi:waves",
+    42: "mdi:hydro-power",
+    50: "mdi:arrow-up-thick",
+    51: "mdi:arrow-down-thick",
+    60: "mdi:thermometer-chevron-up",
+    61: "mdi:thermometer-plus",
+    62: "mdi:thermometer-chevron-down",
+    63: "mdi:thermometer-minus",
+}
+PHENOMENA_TYPE = {
+    "PRECIPITAZIONI": {
+        1: "piogge sparse o intermittenti",
+        2: "piogge diffuse e continue",
+        3: "nevicate deboli o moderate",
+        4: "nevicate abbondanti",
+        5: "rovesci o temporali a carattere isolato",
+        6: "rovesci o temporali a carattere sparso",
+        7: "rovesci o temporali a carattere diffuso",
+    },
+    "VENTI": {
+        10: "forti",
+        11: "burrasca",
+        12: "tempesta",
+        13: "frequenti raffiche",
+    },
+    "GELATE": {
+        20: "diffusa formazione di ghiaccio al suolo a quote collinari",
+        21: "diffusa formazione di ghiaccio al suolo a quote di pianura",
+    },
+    "NEBBIE": {
+        30: "diffuse nelle ore notturne e del primo mattino",
+        31: "diffuse e persistenti anche nelle ore diurne",
+    },
+    "MARI": {
+        40: "molto mosso",
+        41: "agitato o molto agitato",
+        42: "grosso o molto grosso",
+    },
+    "MOTO_ONDOSO": {
+        50: "in aumento",
+        51: "in diminuzione",
+    },
+    "TEMPERATURE": {
+        60: "elevate o in sensibile aumento",
+        61: "molto elevate o in marcato aumento",
+        62: "basse o in sensibile calo",
+        63: "molto basse o in marcato calo",
+    },
+}
+
+REGEX_DPC_DATE = re.compile(r"[0-9]{8}")
+REGEX_DPC_ID = re.compile(r"([0-9]{8})(.json)", re.IGNORECASE)
+REGEX_DPC_ID_DATETIME = re.compile(r"[0-9]{8}_[0-9]{4}", re.IGNORECASE)
+# File names of the bulletins in files/geojson/ of the DPC repositories
+REGEX_CRIT_FILE = re.compile(r"^([0-9]{8}_[0-9]{4})_(today|tomorrow)\.json$")
+REGEX_VIGI_FILE = re.compile(
+    r"^([0-9]{8})_((?:fenomeni_)?(?:oggi|domani|dopodomani))\.json$"
+)
+TIMEOUT = 30
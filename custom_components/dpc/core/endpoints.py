@@ -0,0 +1,161 @@
+"""Mirrors and alternates of the upstream urls, and their latency."""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from .const import LOGGER, TIMEOUT
+
+CONTENTS_API_URL = "https://api.github.com/repos/{}/{}/contents/{}?ref={}"
+CONTENTS_API_HEADERS = {"Accept": "application/vnd.github.raw+json"}
+HEDGE_DELAY = 2.0  # seconds before hedging, until the latency is known
+HEDGE_MIN_DELAY = 0.25  # seconds
+LATENCY_SAMPLES = 5  # latencies needed for a p95
+LATENCY_WINDOW = 50  # latencies kept by endpoint
+MIRROR_COOLDOWN = 300  # seconds a failed mirror is skipped
+RAW_GITHUB_HOST = "raw.githubusercontent.com"
+REGEX_MIRRORS = re.compile(r"[\s,]+")
+
+
+def parse_mirrors(text: str) -> list:
+    """Return the base urls of a comma or space separated list, None if not valid.
+
+    A base url has no query nor fragment: the upstream path goes after it.
+    """
+    mirrors = [
+        mirror.rstrip("/") for mirror in REGEX_MIRRORS.split(text or "") if mirror
+    ]
+    for mirror in mirrors:
+        parts = urlsplit(mirror)
+        if (
+            parts.scheme not in ("http", "https")
+            or not parts.netloc
+            or "?" in mirror
+            or "#" in mirror
+        ):
+            return None
+    return mirrors
+
+
+def mirror_url(base: str, url: str) -> str:
+    """Return url on a mirror: the upstream host and path under base.
+
+    e.g. https://raw.githubusercontent.com/pcm-dpc/... on https://mirror.lan is
+    https://mirror.lan/raw.githubusercontent.com/pcm-dpc/...
+    """
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{base}/{parts.netloc}{parts.path}{query}"
+
+
+def redact_url(url: str) -> str:
+    """Return url without its user, password and query, for the logs and diagnostics."""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if parts.port is not None:
+        host = f"{host}:{parts.port}"
+    return f"{parts.scheme}://{host}{parts.path}"
+
+
+def contents_api_url(url: str) -> str | None:
+    """Return the GitHub contents API url of a raw GitHub url, None for other urls.
+
+    The API answers with the raw file with CONTENTS_API_HEADERS.
+    """
+    parts = urlsplit(url)
+    if parts.netloc != RAW_GITHUB_HOST:
+        return None
+    owner, repo, ref, path = (parts.path.lstrip("/").split("/", 3) + [""] * 3)[:4]
+    if not path:
+        return None
+    return CONTENTS_API_URL.format(owner, repo, path, ref)
+
+
+class LatencyTracker:
+    """Latencies of the last fetches by endpoint, for the delay of the hedged fetches."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self.window = window
+        self._latencies = {}  # Endpoint -> deque of seconds
+
+    def add(self, endpoint: str, seconds: float) -> None:
+        if endpoint not in self._latencies:
+            self._latencies[endpoint] = deque(maxlen=self.window)
+        self._latencies[endpoint].append(seconds)
+
+    def p95(self, endpoint: str) -> float | None:
+        """Return the 95th percentile of the latencies (s), None if too few."""
+        latencies = self._latencies.get(endpoint, ())
+        if len(latencies) < LATENCY_SAMPLES:
+            return None
+        return sorted(latencies)[math.ceil(len(latencies) * 0.95) - 1]
+
+    def delay(self, endpoint: str) -> float:
+        """Return the seconds to wait for a source before hedging with the next one."""
+        p95 = self.p95(endpoint)
+        if p95 is None:
+            return HEDGE_DELAY
+        return min(max(p95, HEDGE_MIN_DELAY), TIMEOUT)
+
+    def status(self) -> dict:
+        """Return the p95 latency (ms) by endpoint, for the diagnostics."""
+        return {
+            endpoint: None if (p95 := self.p95(endpoint)) is None else round(p95 * 1000)
+            for endpoint in self._latencies
+        }
+
+
+class EndpointPool:
+    """Mirrors of the upstream in the configured order, with the upstream as fallback.
+
+    The mirrors are health-checked by the requests themselves: a mirror that
+    does not answer, or answers with a server error, is skipped for cooldown
+    seconds, after the upstream, then tried again. A mirror answering 404 is
+    still healthy, it only has not synced the file yet.
+    """
+
+    def __init__(self, mirrors: list | None = None, cooldown: float = MIRROR_COOLDOWN):
+        self.mirrors = list(mirrors or [])
+        self.cooldown = cooldown
+        self._failed = {}  # Mirror -> time.monotonic() of its last failure
+
+    def urls(self, url: str) -> list:
+        """Return the (mirror, url) to try in order, mirror None for the upstream."""
+        now = time.monotonic()
+        healthy = []
+        cooling = []
+        for mirror in self.mirrors:
+            if self._cooling(mirror, now):
+                cooling.append((mirror, mirror_url(mirror, url)))
+            else:
+                healthy.append((mirror, mirror_url(mirror, url)))
+        return healthy + [(None, url)] + cooling
+
+    def _cooling(self, mirror: str, now: float) -> bool:
+        failed = self._failed.get(mirror)
+        return failed is not None and now - failed < self.cooldown
+
+    def mark_ok(self, mirror: str | None) -> None:
+        if self._failed.pop(mirror, None) is not None:
+            LOGGER.info("Mirror %s is back", redact_url(mirror))
+
+    def mark_failed(self, mirror: str | None) -> None:
+        if mirror is None:
+            return
+        if mirror not in self._failed:
+            LOGGER.warning(
+                "Mirror %s failed, skipped for %s s", redact_url(mirror), self.cooldown
+            )
+        self._failed[mirror] = time.monotonic()
+
+    def status(self) -> dict:
+        """Return the health of every mirror, for the diagnostics, no credentials."""
+        now = time.monotonic()
+        return {
+            redact_url(mirror): "failed" if self._cooling(mirror, now) else "ok"
+            for mirror in self.mirrors
+        }
@@ -4,6 +4,11 @@ __git__ = "https://github.com/brandonxiang/geojson-python-utils"
 __author__ = "brandonxiang"
 
 
+# Margin of the segment boxes in linestrings_intersect (degrees, about 0.1 mm),
+# so the rounding of _segments_intersection never finds a point outside them.
+_SWEEP_EPSILON = 1e-9
+
+
 def linestrings_intersect(line1, line2):
     """
     To valid whether linestrings from geojson are intersected with each other.
@@ -14,39 +19,100 @@ def linestrings_intersect(line1, line2):
     line2 -- second line geojson object
 
     if(line1 intersects with other) return intersect point array else empty array
+
+    The segments are swept by their bounding box, so only the pairs of segments
+    with overlapping boxes are solved; the points and their order are the same
+    of _linestrings_intersect_naive.
+    """
+    segments = []
+    for line, coords in enumerate((line1["coordinates"], line2["coordinates"])):
+        for i in range(0, len(coords) - 1):
+            a, b = coords[i], coords[i + 1]
+            segments.append(
+                (
+                    min(a[0], b[0]) - _SWEEP_EPSILON,
+                    max(a[0], b[0]) + _SWEEP_EPSILON,
+                    min(a[1], b[1]) - _SWEEP_EPSILON,
+                    max(a[1], b[1]) + _SWEEP_EPSILON,
+                    line,
+                    i,
+                )
+            )
+    segments.sort()
+
+    pairs = []
+    active = ([], [])
+    for x_min, x_max, y_min, y_max, line, i in segments:
+        other = active[1 - line]
+        other[:] = [segment for segment in other if segment[0] >= x_min]
+        for other_x_max, other_y_min, other_y_max, j in other:
+            if other_y_min <= y_max and y_min <= other_y_max:
+                pairs.append((i, j) if line == 0 else (j, i))
+        active[line].append((x_max, y_min, y_max, i))
+    pairs.sort()
+
+    intersects = []
+    for i, j in pairs:
+        point = _segments_intersection(
+            line1["coordinates"][i],
+            line1["coordinates"][i + 1],
+            line2["coordinates"][j],
+            line2["coordinates"][j + 1],
+        )
+        if point:
+            intersects.append(point)
+    return intersects
+
+
+def _linestrings_intersect_naive(line1, line2):
+    """
+    linestrings_intersect solving every pair of segments, the reference of the sweep
     """
     intersects = []
     for i in range(0, len(line1["coordinates"]) - 1):
         for j in range(0, len(line2["coordinates"]) - 1):
-            a1_x = line1["coordinates"][i][1]
-            a1_y = line1["coordinates"][i][0]
-            a2_x = line1["coordinates"][i + 1][1]
-            a2_y = line1["coordinates"][i + 1][0]
-            b1_x = line2["coordinates"][j][1]
-            b1_y = line2["coordinates"][j][0]
-            b2_x = line2["coordinates"][j + 1][1]
-            b2_y = line2["coordinates"][j + 1][0]
-            ua_t = (b2_x - b1_x) * (a1_y - b1_y) - (b2_y - b1_y) * (a1_x - b1_x)
-            ub_t = (a2_x - a1_x) * (a1_y - b1_y) - (a2_y - a1_y) * (a1_x - b1_x)
-            u_b = (b2_y - b1_y) * (a2_x - a1_x) - (b2_x - b1_x) * (a2_y - a1_y)
-            if not u_b == 0:
-                u_a = ua_t / u_b
-                u_b = ub_t / u_b
-                if 0 <= u_a and u_a <= 1 and 0 <= u_b and u_b <= 1:
-                    intersects.append(
-                        {
-                            "type": "Point",
-                            "coordinates": [
-                                a1_x + u_a * (a2_x - a1_x),
-                                a1_y + u_a * (a2_y - a1_y),
-                            ],
-                        }
-                    )
+            point = _segments_intersection(
+                line1["coordinates"][i],
+                line1["coordinates"][i + 1],
+                line2["coordinates"][j],
+                line2["coordinates"][j + 1],
+            )
+            if point:
+                intersects.append(point)
     # if len(intersects) == 0:
     #     intersects = False
     return intersects
 
 
+def _segments_intersection(a1, a2, b1, b2):
+    """
+    the intersection point of the segments a1-a2 and b1-b2, None if they do not intersect
+    """
+    a1_x = a1[1]
+    a1_y = a1[0]
+    a2_x = a2[1]
+    a2_y = a2[0]
+    b1_x = b1[1]
+    b1_y = b1[0]
+    b2_x = b2[1]
+    b2_y = b2[0]
+    ua_t = (b2_x - b1_x) * (a1_y - b1_y) - (b2_y - b1_y) * (a1_x - b1_x)
+    ub_t = (a2_x - a1_x) * (a1_y - b1_y) - (a2_y - a1_y) * (a1_x - b1_x)
+    u_b = (b2_y - b1_y) * (a2_x - a1_x) - (b2_x - b1_x) * (a2_y - a1_y)
+    if not u_b == 0:
+        u_a = ua_t / u_b
+        u_b = ub_t / u_b
+        if 0 <= u_a and u_a <= 1 and 0 <= u_b and u_b <= 1:
+            return {
+                "type": "Point",
+                "coordinates": [
+                    a1_x + u_a * (a2_x - a1_x),
+                    a1_y + u_a * (a2_y - a1_y),
+                ],
+            }
+    return None
+
+
 def _bbox_around_polycoords(coords):
     """
     bounding box
@@ -78,6 +144,13 @@ def _pnpoly(x, y, coords):
     the algorithm to judge whether the point is located in polygon
     reference: https://www.ecse.rpi.edu/~wrf/Research/Short_Notes/pnpoly.html#Explanation
     """
+    return _pnpoly_vertices(x, y, _polygon_vertices(coords))
+
+
+def _polygon_vertices(coords):
+    """
+    the vertices of all the rings of a polygon joined through [0, 0], as used by _pnpoly
+    """
     vert = [[0, 0]]
 
     for coord in coords:
@@ -86,6 +159,13 @@ def _pnpoly(x, y, coords):
         vert.append(coord[0])
         vert.append([0, 0])
 
+    return vert
+
+
+def _pnpoly_vertices(x, y, vert):
+    """
+    _pnpoly on the vertices prepared by _polygon_vertices
+    """
     inside = False
 
     i = 0
@@ -424,105 +504,66 @@ def simplify(source, kink=20):
     source[] array of geojson points
     kink	in metres, kinks above this depth kept
     kink depth is the height of the triangle abc where a-b and b-c are two consecutive line segments
+
+    return the array of the geojson points kept, see simplify_coords
+    """
+    coords = simplify_coords([point["coordinates"] for point in source], kink)
+    return [{"type": "Point", "coordinates": coord} for coord in coords]
+
+
+def simplify_coords(coords, tolerance):
     """
-    source_coord = map(lambda o: {"lng": o.coordinates[0], "lat": o.coordinates[1]}, source)
-
-    # count, n_stack, n_dest, start, end, i, sig;
-    # dev_sqr, max_dev_sqr, band_sqr;
-    # x12, y12, d12, x13, y13, d13, x23, y23, d23;
-    F = (math.pi / 180.0) * 0.5
-    index = []  # aray of indexes of source points to include in the reduced line
-    sig_start = []  # indices of start & end of working section
-    sig_end = []
-
-    # check for simple cases
-    count = len(source_coord)
-    if count < 3:
-        return source_coord  # one or two points
-
-    # more complex case. initialize stack
-
-    band_sqr = kink * 360.0 / (2.0 * math.pi * 6378137.0)  # Now in degrees
-    band_sqr *= band_sqr
-    n_dest = 0
-    sig_start[0] = 0
-    sig_end[0] = count - 1
-    n_stack = 1
-
-    # while the stack is not empty
-    while n_stack > 0:
-        # ... pop the top-most entries off the stacks
-        start = sig_start[n_stack - 1]
-        end = sig_end[n_stack - 1]
-        n_stack -= 1
-
-        if (end - start) > 1:  # any intermediate points ?
-            # ... yes, so find most deviant intermediate point to either side of line joining start & end points
-            x12 = source[end]["lng"] - source[start]["lng"]
-            y12 = source[end]["lat"] - source[start]["lat"]
-            if math.fabs(x12) > 180.0:
-                x12 = 360.0 - math.fabs(x12)
-            x12 *= math.cos(
-                F * (source[end]["lat"] + source[start]["lat"])
-            )  # use avg lat to reduce lng
-            d12 = (x12 * x12) + (y12 * y12)
-
-            i = start + 1
-            sig = start
-            max_dev_sqr = -1.0
-            while i < end:
-                x13 = source[i]["lng"] - source[start]["lng"]
-                y13 = source[i]["lat"] - source[start]["lat"]
-                if math.fabs(x13) > 180.0:
-                    x13 = 360.0 - math.fabs(x13)
-                x13 *= math.cos(F * (source[i]["lat"] + source[start]["lat"]))
-                d13 = (x13 * x13) + (y13 * y13)
-                x23 = source[i]["lng"] - source[end]["lng"]
-                y23 = source[i]["lat"] - source[end]["lat"]
-                if math.fabs(x23) > 180.0:
-                    x23 = 360.0 - math.fabs(x23)
-                x23 *= math.cos(F * (source[i]["lat"] + source[end]["lat"]))
-                d23 = (x23 * x23) + (y23 * y23)
-
-                if d13 >= (d12 + d23):
-                    dev_sqr = d23
-                elif d23 >= (d12 + d13):
-                    dev_sqr = d13
-                else:
-                    dev_sqr = (
-                        (x13 * y12 - y13 * x12) * (x13 * y12 - y13 * x12) / d12
-                    )  # solve triangle
-                if dev_sqr > max_dev_sqr:
-                    sig = i
-                    max_dev_sqr = dev_sqr
-                i += 1
-
-            if max_dev_sqr < band_sqr:  # is there a sig. intermediate point ?
-                # ... no, so transfer current start point
-                index[n_dest] = start
-                n_dest += 1
-            else:  # ... yes, so push two sub-sections on stack for further processing
-                n_stack += 1
-                sig_start[n_stack - 1] = sig
-                sig_end[n_stack - 1] = end
-                n_stack += 1
-                sig_start[n_stack - 1] = start
-                sig_end[n_stack - 1] = sig
-
-        else:  # ... no intermediate points, so transfer current start point
-            index[n_dest] = start
-            n_dest += 1
-
-    # transfer last point
-    index[n_dest] = count - 1
-    n_dest += 1
-
-    # make return array
-    r = []
-    for i in range(0, n_dest):
-        r.append(source_coord[index[i]])
-
-    return map(lambda o: {"type": "Point", "coordinates": [o.lng, o.lat]}, r)
+    Douglas-Peucker simplification of an array of coordinates
+    reference: https://en.wikipedia.org/wiki/Ramer%E2%80%93Douglas%E2%80%93Peucker_algorithm
+
+    Keyword arguments:
+    coords    -- array of [lon, lat] coordinates, a line or a closed ring
+    tolerance -- in metres, no coordinate removed is farther from the simplified line
+
+    return the array of the coordinates kept, the first and the last always included
+    """
+    count = len(coords)
+    if count < 3 or tolerance <= 0:
+        return list(coords)
+
+    # Longitudes scaled at the latitude nearest to the equator overestimate the
+    # distances, so the tolerance holds across the whole line
+    ky = 6371 * 1000 * math.pi / 180
+    kx = ky * math.cos(number2radius(min(abs(coord[1]) for coord in coords)))
+    xs = [coord[0] * kx for coord in coords]
+    ys = [coord[1] * ky for coord in coords]
+    band_sqr = tolerance * tolerance
+
+    keep = [False] * count
+    keep[0] = keep[count - 1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        ax, ay = xs[start], ys[start]
+        dx, dy = xs[end] - ax, ys[end] - ay
+        length = dx * dx + dy * dy
+        sig = start
+        max_dev_sqr = -1.0
+        # Distance of the intermediate points from the segment start-end
+        for i in range(start + 1, end):
+            px, py = xs[i] - ax, ys[i] - ay
+            dot = px * dx + py * dy
+            if dot <= 0 or length == 0:
+                dev_sqr = px * px + py * py
+            elif dot >= length:
+                dev_sqr = (px - dx) * (px - dx) + (py - dy) * (py - dy)
+            else:
+                cross = px * dy - py * dx
+                dev_sqr = cross * cross / length
+            if dev_sqr > max_dev_sqr:
+                sig = i
+                max_dev_sqr = dev_sqr
+        if max_dev_sqr > band_sqr:
+            keep[sig] = True
+            stack.append((sig, end))
+            stack.append((start, sig))
+
+    return [coord for coord, kept in zip(coords, keep) if kept]
 
 
 def calculate_initial_compass_bearing(pointA, pointB) -> tuple:
@@ -0,0 +1,119 @@
+"""Budget of the requests to the GitHub API, within its rate limit."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime, timezone
+
+GITHUB_API_HOST = "api.github.com"
+GITHUB_BURST = 4  # requests allowed at once, e.g. the ids of both bulletins
+GITHUB_ETAG_BODY = 256 * 1024  # bytes, larger answers are not kept for the ETags
+GITHUB_ETAG_ENTRIES = 16
+GITHUB_LIMIT = 60  # requests per hour without a token
+GITHUB_RESERVE = 0.1  # fraction of the limit never spent
+GITHUB_TOKEN_LIMIT = 5000  # requests per hour with a token
+GITHUB_WINDOW = 3600  # seconds
+
+
+def _header_int(headers: Mapping, name: str) -> int | None:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class RateLimitBudget:
+    """Requests left to the GitHub API, shared by all the clients of a token.
+
+    The X-RateLimit headers of every answer give the requests left and the end
+    of the window. The requests left, but a reserve, are spread evenly until
+    the end of the window, in bursts of GITHUB_BURST at most: a request over
+    the budget is refused and the caller falls back to another source, so the
+    limit is never exhausted. The answers are kept with their ETag: a 304 to
+    a conditional request does not count against the limit.
+    """
+
+    def __init__(self, token: str = "") -> None:
+        self.token = token
+        self.limit = GITHUB_TOKEN_LIMIT if token else GITHUB_LIMIT
+        self.remaining = self.limit
+        self.reset = time.time() + GITHUB_WINDOW
+        self._tokens = float(GITHUB_BURST)
+        self._refilled = time.time()
+        self._hold = 0.0  # time.time() until no request is sent, from Retry-After
+        self._etags = OrderedDict()  # Url -> (etag, body, encoding)
+
+    def headers(self, url: str) -> dict:
+        """Return the headers of a request to url: version, token and ETag."""
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if url in self._etags:
+            headers["If-None-Match"] = self._etags[url][0]
+        return headers
+
+    def acquire(self) -> bool:
+        """Spend a request if the budget allows it now."""
+        now = time.time()
+        if now >= self.reset:  # A new window, until the headers tell otherwise
+            self.remaining = self.limit
+            self.reset = now + GITHUB_WINDOW
+        spendable = self.remaining - math.ceil(self.limit * GITHUB_RESERVE)
+        if spendable <= 0 or now < self._hold:
+            return False
+        rate = spendable / max(self.reset - now, 1)
+        self._tokens = min(GITHUB_BURST, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self.remaining -= 1
+        return True
+
+    def update(self, headers: Mapping, status: int) -> None:
+        """Update the budget with the headers of an answer of the API."""
+        limit = _header_int(headers, "X-RateLimit-Limit")
+        remaining = _header_int(headers, "X-RateLimit-Remaining")
+        reset = _header_int(headers, "X-RateLimit-Reset")
+        if limit is not None:
+            self.limit = limit
+        if remaining is not None:
+            self.remaining = remaining
+        if reset is not None:
+            self.reset = reset
+        retry_after = _header_int(headers, "Retry-After")
+        if status in (403, 429) and retry_after is not None:
+            self._hold = time.time() + retry_after
+        if status == 304:  # Free, the request spent is given back
+            self._tokens = min(GITHUB_BURST, self._tokens + 1)
+
+    def cached(self, url: str) -> tuple[bytes, str] | None:
+        """Return the body and the encoding of the last answer of url."""
+        if url not in self._etags:
+            return None
+        self._etags.move_to_end(url)
+        return self._etags[url][1:]
+
+    def store(self, url: str, etag: str | None, body: bytes, encoding: str) -> None:
+        """Keep an answer for the conditional requests of url."""
+        if not etag or len(body) > GITHUB_ETAG_BODY:
+            return
+        self._etags[url] = (etag, body, encoding)
+        self._etags.move_to_end(url)
+        while len(self._etags) > GITHUB_ETAG_ENTRIES:
+            self._etags.popitem(last=False)
+
+    def status(self) -> dict:
+        """Return the state of the budget, for the diagnostics."""
+        return {
+            "token": bool(self.token),
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset": datetime.fromtimestamp(self.reset, timezone.utc).isoformat(),
+        }
@@ -0,0 +1,424 @@
+"""Spatial indexes of a decoded bulletin, shared by every location resolved on it."""
+
+from __future__ import annotations
+
+import math
+from array import array
+
+from .const import ATTR_LEVEL, ATTR_ZONE_NAME, RISKS
+from .geometry import (
+    _bbox_around_polycoords,
+    _pnpoly_vertices,
+    _polygon_vertices,
+    geometry_within_radius,
+    number2radius,
+    simplify_coords,
+)
+from .parsers import get_info_level
+
+EARTH_RADIUS = 6371 * 1000
+PHENOMENA_GRID = 0.25  # degrees, about 28 Km of latitude
+
+
+def _polycoords(geometry: dict | None) -> list:
+    """Return the polygons (lists of rings) of a Polygon or MultiPolygon."""
+    if geometry is None:  # Not decoded by load_features
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+def _simplify_ring(ring: list, tolerance: float) -> list:
+    """Return the ring simplified, or the ring itself if it would collapse."""
+    simplified = simplify_coords(ring, tolerance)
+    return simplified if len(simplified) >= 4 else ring
+
+
+def _tangent_plane(point: dict) -> tuple:
+    """Return the origin and the metres per degree of the plane tangent at point."""
+    longitude, latitude = point["coordinates"][:2]
+    ky = EARTH_RADIUS * math.pi / 180
+    return longitude, latitude, ky * math.cos(number2radius(latitude)), ky
+
+
+def _bbox_distance(bbox: list, plane: tuple) -> float:
+    """Return the distance (m) of a [minlat, minlon, maxlat, maxlon] bbox on the plane."""
+    longitude, latitude, kx, ky = plane
+    dx = max(bbox[1] - longitude, 0.0, longitude - bbox[3]) * kx
+    dy = max(bbox[0] - latitude, 0.0, latitude - bbox[2]) * ky
+    return math.hypot(dx, dy)
+
+
+def _circle_window(
+    lon_c: float, lat_c: float, radius: float
+) -> tuple[float, float] | None:
+    """Return the max lat and lon offsets (degrees) of a circle.
+
+    The distance is never shorter than the arc along the meridian, and the
+    longitude of the circle spans asin(sin(angle) / cos(lat)) at most. None
+    over a pole or across ±180, where the offsets do not bound the circle.
+    """
+    angle = radius / EARTH_RADIUS
+    cos_c = math.cos(number2radius(lat_c))
+    if angle >= math.pi / 2 or math.sin(angle) >= cos_c:
+        return None
+    max_lat = math.degrees(angle) * (1 + 1e-9)
+    max_lon = math.degrees(math.asin(math.sin(angle) / cos_c)) * (1 + 1e-9)
+    if not -180 <= lon_c - max_lon <= lon_c + max_lon <= 180:
+        return None
+    return max_lat, max_lon
+
+
+def _segment_distance(ax: float, ay: float, bx: float, by: float) -> float:
+    """Return the distance of the origin from the segment a-b on the plane."""
+    dx = bx - ax
+    dy = by - ay
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else max(0.0, min(1.0, -(ax * dx + ay * dy) / length))
+    return math.hypot(ax + t * dx, ay + t * dy)
+
+
+def _zone_levels(prop: dict) -> dict:
+    """Return the levels of a zone by column, 0 when missing or not valid."""
+
+    def _level(value):
+        try:
+            return get_info_level(value)[ATTR_LEVEL]
+        except (AttributeError, IndexError):
+            return 0
+
+    if "Rappresentata nella mappa" in prop:  # Criticality
+        levels = {ATTR_LEVEL: _level(prop["Rappresentata nella mappa"])}
+        for risk in RISKS:
+            levels[risk] = _level(prop.get("Per rischio " + risk))
+        return levels
+    try:  # Vigilance
+        return {ATTR_LEVEL: int(prop.get("id_classificazione"))}
+    except (TypeError, ValueError):
+        return {ATTR_LEVEL: 0}
+
+
+class MunicipalityTable:
+    """Municipalities of the zones of a bulletin, built in one pass.
+
+    Every municipality of the Comuni lists is a row. The zones of a row are
+    kept in CSR form (its slice of one array of feature indexes, bounded by
+    offsets) and the max level of its zones in one array per column: level,
+    plus one per risk for the criticality.
+    """
+
+    def __init__(self, features: list) -> None:
+        self.rows = {}  # Lowercase name -> row
+        self.names = []
+        self.columns = {}
+        members = []
+        for position, feature in enumerate(features):
+            prop = feature.get("properties") or {}
+            # Different key (Comuni, comuni) for Criticality end Vigilance
+            comuni = prop.get("Comuni", prop.get("comuni")) or []
+            levels = _zone_levels(prop)
+            for column in levels:
+                if column not in self.columns:
+                    self.columns[column] = array("h", [0] * len(self.names))
+            for city in comuni:
+                key = city.lower()
+                row = self.rows.get(key)
+                if row is None:
+                    row = self.rows[key] = len(self.names)
+                    self.names.append(city)
+                    members.append([])
+                    for values in self.columns.values():
+                        values.append(0)
+                if not members[row] or members[row][-1] != position:
+                    members[row].append(position)
+                for column, level in levels.items():
+                    if level > self.columns[column][row]:
+                        self.columns[column][row] = level
+
+        self._offsets = array("I", [0])
+        self._features = array("I")
+        for positions in members:
+            self._features.extend(positions)
+            self._offsets.append(len(self._features))
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self.rows
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def features(self, name: str) -> array:
+        """Return the indexes of the features listing the municipality."""
+        row = self.rows.get(name.lower())
+        if row is None:
+            return array("I")
+        return self._features[self._offsets[row] : self._offsets[row + 1]]
+
+    def levels(self, name: str) -> dict | None:
+        """Return the max level by column of the zones of the municipality."""
+        row = self.rows.get(name.lower())
+        if row is None:
+            return None
+        return {column: values[row] for column, values in self.columns.items()}
+
+
+class ZoneIndex:
+    """Zones of a bulletin with their bounding boxes and vertices prepared once.
+
+    contains() and find() give the same answers of point_in_polygon over the
+    features, without rebuilding the bounding box and the vertices on every call.
+    The municipalities of the zones are in the MunicipalityTable municipalities.
+
+    With a tolerance (m) the rings are simplified once with simplify_coords:
+    every test touches fewer vertices, and the boundaries move by no more than
+    the tolerance.
+    """
+
+    def __init__(self, geojs: dict, tolerance: float = 0) -> None:
+        self.geojs = geojs
+        self.features = geojs["features"]
+        # Per feature: the bbox of all its polygons, [(bbox, vertices)] by polygon
+        # and the polygons (lists of rings) tested
+        self._bounds = []
+        self._polygons = []
+        self._coords = []
+        for feature in self.features:
+            polycoords = _polycoords(feature["geometry"])
+            if tolerance:
+                polycoords = [
+                    [_simplify_ring(ring, tolerance) for ring in coord]
+                    for coord in polycoords
+                ]
+            polygons = [
+                (_bbox_around_polycoords(coord), _polygon_vertices(coord))
+                for coord in polycoords
+            ]
+            self._polygons.append(polygons)
+            self._coords.append(polycoords)
+            self._bounds.append(
+                [
+                    min(bbox[0] for bbox, _ in polygons),
+                    min(bbox[1] for bbox, _ in polygons),
+                    max(bbox[2] for bbox, _ in polygons),
+                    max(bbox[3] for bbox, _ in polygons),
+                ]
+                if polygons
+                else [math.inf, math.inf, -math.inf, -math.inf]
+            )
+        self.municipalities = MunicipalityTable(self.features)
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def contains(self, index: int, point: dict) -> bool:
+        """Return whether the feature at index contains the point."""
+        longitude, latitude = point["coordinates"][:2]
+        bounds = self._bounds[index]
+        if not (
+            bounds[0] <= latitude <= bounds[2] and bounds[1] <= longitude <= bounds[3]
+        ):
+            return False
+        polygons = self._polygons[index]
+        # As _point_in_polygon: every polygon is tested once any bbox holds the point
+        if not any(
+            bbox[0] <= latitude <= bbox[2] and bbox[1] <= longitude <= bbox[3]
+            for bbox, _ in polygons
+        ):
+            return False
+        return any(_pnpoly_vertices(latitude, longitude, vert) for _, vert in polygons)
+
+    def find(self, point: dict) -> int | None:
+        """Return the index of the first feature containing the point."""
+        for index in range(len(self.features)):
+            if self.contains(index, point):
+                return index
+        return None
+
+    def nearest(self, point: dict) -> tuple[int | None, float]:
+        """Return the index of the feature nearest to the point and its distance (m).
+
+        Distances are measured on the plane tangent at the point, accurate at
+        the scale of the gaps between zones. The features, then their polygons,
+        are visited by the distance of their bbox, a lower bound of the distance
+        of their edges, so the edges of the far ones are never measured.
+        """
+        plane = _tangent_plane(point)
+        best, best_distance = None, math.inf
+        candidates = sorted(
+            (_bbox_distance(bounds, plane), index)
+            for index, bounds in enumerate(self._bounds)
+        )
+        for lower_bound, index in candidates:
+            if lower_bound >= best_distance:
+                break
+            distance = self._edge_distance(index, plane, best_distance)
+            if distance < best_distance:
+                best, best_distance = index, distance
+        return best, best_distance
+
+    def within(self, point: dict, radius: float) -> list:
+        """Return the indexes of the features intersecting the circle of radius (m).
+
+        A feature intersects the circle if it contains the center or one of
+        its edges is within radius, measured as in nearest(). The features
+        whose bbox is farther than radius are never measured.
+        """
+        plane = _tangent_plane(point)
+        return [
+            index
+            for index, bounds in enumerate(self._bounds)
+            if _bbox_distance(bounds, plane) <= radius
+            and (
+                self.contains(index, point)
+                or self._edge_distance(index, plane, radius) <= radius
+            )
+        ]
+
+    def locate(self, point: dict, municipality: str = "", radius: float = 0) -> list:
+        """Return the indexes of the zones of a location, as get_properties picks them.
+
+        The zones listing the municipality, else the zone containing the point
+        or the nearest one, plus the zones within radius (m) when given.
+        """
+        positions = list(self.municipalities.features(municipality or ""))
+        if not positions:
+            position = self.find(point)
+            if position is None:
+                position, _ = self.nearest(point)
+            if position is not None:
+                positions.append(position)
+        if radius:
+            positions.extend(self.within(point, radius))
+        return sorted(set(positions))
+
+    def feature(self, index: int, tolerance: float = 0) -> dict:
+        """Return the zone at index as a GeoJSON feature with its levels.
+
+        The rings are the prepared ones, simplified again with tolerance (m)
+        when given. The properties are the zone name and its levels by column.
+        """
+        polycoords = self._coords[index]
+        if tolerance:
+            polycoords = [
+                [_simplify_ring(ring, tolerance) for ring in coord]
+                for coord in polycoords
+            ]
+        prop = self.features[index].get("properties") or {}
+        return {
+            "type": "Feature",
+            "geometry": (
+                {"type": "Polygon", "coordinates": polycoords[0]}
+                if len(polycoords) == 1
+                else {"type": "MultiPolygon", "coordinates": polycoords}
+            ),
+            "properties": {
+                # Different key (Nome zona, Nome_Zona) for Criticality end Vigilance
+                ATTR_ZONE_NAME: prop.get("Nome zona", prop.get("Nome_Zona")),
+                **_zone_levels(prop),
+            },
+        }
+
+    def _edge_distance(self, index: int, plane: tuple, limit: float) -> float:
+        """Return the distance of the nearest edge of a feature, if below limit."""
+        longitude, latitude, kx, ky = plane
+        best = math.inf
+        for (bbox, _), coords in zip(self._polygons[index], self._coords[index]):
+            if _bbox_distance(bbox, plane) > min(best, limit):
+                continue
+            for ring in coords:
+                xs = [(node[0] - longitude) * kx for node in ring]
+                ys = [(node[1] - latitude) * ky for node in ring]
+                # The ring is closed by its first node, as in _polygon_vertices
+                for i in range(len(ring)):
+                    distance = _segment_distance(xs[i - 1], ys[i - 1], xs[i], ys[i])
+                    if distance < best:
+                        best = distance
+        return best
+
+
+class PhenomenaIndex:
+    """Phenomena of a bulletin with the points bucketed in a lat/lon grid.
+
+    within() gives the same answers of geometry_within_radius over the features,
+    visiting only the cells of the grid overlapping the bbox of the circle. The
+    trigonometry of the points is computed once per bulletin.
+    """
+
+    def __init__(self, geojs: dict, grid: float = PHENOMENA_GRID) -> None:
+        self.geojs = geojs
+        self.features = geojs["features"]
+        self._grid = grid
+        self._buckets = {}  # (row, col) -> indexes of the points in the cell
+        self._shapes = []  # Indexes of the features that are not points
+        self._lats = array("d")
+        self._lons = array("d")
+        self._cos_lats = array("d")
+        for index, feature in enumerate(self.features):
+            geometry = feature["geometry"]
+            is_point = geometry is not None and geometry["type"] == "Point"
+            lon, lat = geometry["coordinates"][:2] if is_point else (0.0, 0.0)
+            if is_point:
+                cell = (math.floor(lat / grid), math.floor(lon / grid))
+                self._buckets.setdefault(cell, []).append(index)
+            elif geometry is not None:  # None if not decoded by load_features
+                self._shapes.append(index)
+            self._lats.append(lat)
+            self._lons.append(lon)
+            self._cos_lats.append(math.cos(number2radius(lat)))
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def _candidates(self, lon_c: float, lat_c: float, radius: float) -> list:
+        """Return the indexes of the points in the cells overlapping the circle bbox."""
+        window = _circle_window(lon_c, lat_c, radius)
+        if window is None:
+            rows = cols = None
+        else:
+            max_lat, max_lon = window
+            rows = range(
+                math.floor((lat_c - max_lat) / self._grid),
+                math.floor((lat_c + max_lat) / self._grid) + 1,
+            )
+            cols = range(
+                math.floor((lon_c - max_lon) / self._grid),
+                math.floor((lon_c + max_lon) / self._grid) + 1,
+            )
+        if rows is None or len(rows) * len(cols) > len(self._buckets):
+            return [
+                index
+                for (row, col), indexes in self._buckets.items()
+                if rows is None or (row in rows and col in cols)
+                for index in indexes
+            ]
+        return [
+            index
+            for row in rows
+            for col in cols
+            for index in self._buckets.get((row, col), ())
+        ]
+
+    def within(self, center: dict, radius: float) -> list:
+        """Return the indexes of the features within radius (m) from center."""
+        lon_c, lat_c = center["coordinates"][:2]
+        cos_c = math.cos(number2radius(lat_c))
+        result = []
+        for index in sorted(self._candidates(lon_c, lat_c, radius) + self._shapes):
+            if self.features[index]["geometry"]["type"] != "Point":
+                if geometry_within_radius(
+                    self.features[index]["geometry"], center, radius
+                ):
+                    result.append(index)
+                continue
+            # Same operations of point_distance(geometry, center)
+            deg_lat = number2radius(lat_c - self._lats[index])
+            deg_lon = number2radius(lon_c - self._lons[index])
+            cos_lat = self._cos_lats[index]
+            a = math.pow(math.sin(deg_lat / 2), 2) + cos_lat * cos_c * math.pow(
+                math.sin(deg_lon / 2), 2
+            )
+            c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+            if (6371 * c) * 1000 <= radius:
+                result.append(index)
+        return result
@@ -0,0 +1,57 @@
+"""JSON decoding of the bulletins, with the fastest backend installed.
+
+orjson and msgspec decode the bytes of an answer directly, several times
+faster than json on the national GeoJSON; Home Assistant already ships
+orjson. Every backend returns the same dicts and lists, and raises
+ValueError on a malformed document.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _json_loads(data: bytes | str) -> Any:
+    return json.loads(data)
+
+
+def _orjson_loads(data: bytes | str) -> Any:
+    return orjson.loads(data)
+
+
+def _msgspec_loads(data: bytes | str) -> Any:
+    try:
+        return _msgspec_decode(data)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
+
+
+_msgspec_decode = msgspec.json.Decoder().decode if msgspec else None
+
+# Backends installed, the fastest first
+BACKENDS = {
+    name: loads
+    for name, loads, module in (
+        ("orjson", _orjson_loads, orjson),
+        ("msgspec", _msgspec_loads, msgspec),
+        ("json", _json_loads, json),
+    )
+    if module is not None
+}
+BACKEND = next(iter(BACKENDS))
+
+
+def loads(data: bytes | str) -> Any:
+    """Return the document decoded by the fastest backend, ValueError if malformed."""
+    return BACKENDS[BACKEND](data)
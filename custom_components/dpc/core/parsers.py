@@ -0,0 +1,312 @@
+"""Parsers of the DPC bulletins, shared by the client and the offline tools."""
+
+from __future__ import annotations
+
+import heapq
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from .const import (
+    ATTR_ALERT,
+    ATTR_EXPIRES,
+    ATTR_ID,
+    ATTR_IMAGE_URL,
+    ATTR_INFO,
+    ATTR_LEVEL,
+    ATTR_LINK,
+    ATTR_PRECIPITATION,
+    ATTR_PUBLICATION_DATE,
+    ATTR_RISK,
+    ATTR_ZONE_NAME,
+    CRIT_BULLETIN_URL,
+    CRIT_ICON,
+    DEFAULT_ICON,
+    LOGGER,
+    PHENOMENA_ICON,
+    PHENOMENA_TYPE,
+    RISKS,
+    VIGI_BULLETIN_URL,
+    VIGI_ICON,
+    WARNING_ALERT,
+)
+from .geometry import (
+    calculate_initial_compass_bearing,
+    geometry_within_radius,
+    point_distance,
+    point_in_polygon,
+)
+
+if TYPE_CHECKING:
+    from .index import PhenomenaIndex, ZoneIndex
+
+
+def get_info_level(value: str) -> dict:
+    d = {}
+    d[ATTR_INFO] = value.split("/")[0].rstrip().lstrip()
+    d[ATTR_ALERT] = value.split("/")[1].lstrip()
+    d[ATTR_LEVEL] = WARNING_ALERT.get(d[ATTR_ALERT], 0)
+    return d
+
+
+def get_properties(
+    geojs: dict,
+    point: dict,
+    comune_conf: str = "",
+    name: str = "",
+    index: ZoneIndex | None = None,
+    radius: float = 0,
+) -> dict:
+    """Return the properties of the zone of a municipality or of a point.
+
+    With the ZoneIndex of the bulletin the zones are not prepared again and
+    the zones of the municipality are taken from its MunicipalityTable. With
+    a radius (Km) too, the levels are the highest of all the zones within
+    radius from the point.
+    """
+
+    def _contains(position, feature):
+        if index:
+            return index.contains(position, point)
+        return point_in_polygon(point, feature["geometry"])
+
+    def _from_city():
+        LOGGER.debug("[%s] Getting property from the city [%s]", name, comune_conf)
+        zones = []
+        point_in_zone = ""
+        if index:
+            positions = index.municipalities.features(comune_conf)
+        else:
+            positions = range(len(geojs["features"]))
+        for position in positions:
+            feature = geojs["features"][position]
+            # Copy, the bulletin can be resolved again for other points
+            prop = dict(feature["properties"])
+            # Different key (Comuni, comuni) for Criticality end Vigilance
+            comuni = prop.get("Comuni", prop.get("comuni"))
+            comune = [
+                city.lower() for city in comuni if comune_conf.lower() == city.lower()
+            ]
+
+            if not comune:
+                continue
+
+            # Getting a unique zone from coordinates
+            if _contains(position, feature):
+                # Different key (Nome zona, Nome_Zona) for Criticality end Vigilance
+                point_in_zone = prop.get("Nome zona", prop.get("Nome_Zona"))
+                LOGGER.debug("[%s] Point In Polygon. Zone: %s", name, point_in_zone)
+
+            # Check if Criticality and added "id_classificazione" with the highest alert
+            critical = prop.get("Rappresentata nella mappa")
+            if critical:
+                id_class = get_info_level(critical).get(ATTR_LEVEL)
+                prop.update({"id_classificazione": id_class})
+
+            zones.append(prop)
+
+            LOGGER.debug(
+                "[%s] City: %s - Zone: %s - ID: %s - Info: %s",
+                name,
+                comune,
+                prop.get("Nome zona", prop.get("Nome_Zona")),
+                prop.get("id_classificazione"),
+                critical,
+            )
+
+        if not zones:
+            LOGGER.error("[%s] City not found [%s]", name, comune_conf)
+            return _from_point()
+
+        zone = sorted(zones, key=lambda i: i["id_classificazione"], reverse=True)[0]
+        zone.update({ATTR_ZONE_NAME: point_in_zone})
+        return zone
+
+    def _from_point():
+        LOGGER.debug("[%s] Getting properties from coordinates %s", name, point)
+        if index:
+            position = index.find(point)
+            if position is None:
+                # Coasts and borders can fall in the gaps between the zones
+                position, distance = index.nearest(point)
+                if position is not None:
+                    LOGGER.info(
+                        "[%s] Not point in polygons %s, nearest zone at %.0f m",
+                        name,
+                        point,
+                        distance,
+                    )
+            if position is not None:
+                return geojs["features"][position]["properties"]
+        else:
+            for feature in geojs["features"]:
+                if not point_in_polygon(point, feature["geometry"]):
+                    continue
+                return feature["properties"]
+        LOGGER.error("[%s] Not point in polygons [%s]", name, point)
+
+    prop = _from_city() if comune_conf else _from_point()
+    if prop is None or not (radius and index):
+        return prop
+    positions = index.within(point, radius * 1000)
+    LOGGER.debug("[%s] %s zones within %s Km", name, len(positions), radius)
+    return merge_zones([prop] + [geojs["features"][p]["properties"] for p in positions])
+
+
+def merge_zones(zones: list) -> dict:
+    """Return the properties of the first zone with the highest levels of all the zones."""
+    merged = dict(zones[0])
+    if "Rappresentata nella mappa" in merged:  # Criticality
+        for key in ["Rappresentata nella mappa"] + ["Per rischio " + r for r in RISKS]:
+            merged[key] = max(
+                (zone[key] for zone in zones),
+                key=lambda value: get_info_level(value)[ATTR_LEVEL],
+            )
+        if "id_classificazione" in merged:
+            merged["id_classificazione"] = get_info_level(
+                merged["Rappresentata nella mappa"]
+            )[ATTR_LEVEL]
+    else:  # Vigilance
+        zone = max(zones, key=lambda zone: int(zone["id_classificazione"]))
+        merged["id_classificazione"] = zone["id_classificazione"]
+        merged["Quantitativi_previsti"] = zone["Quantitativi_previsti"]
+    return merged
+
+
+def _parse_phenomenon(point: dict, prop: dict, distance: float) -> dict | None:
+    """Return a phenomenon of the bulletin, None if its type is unknown."""
+    longitude, latitude = point["coordinates"]
+    for p_event, p_id_phenom in PHENOMENA_TYPE.items():
+        if not prop["id_fenomeno"] in p_id_phenom:
+            continue
+        id_event = prop["id_fenomeno"]
+        lat, long = prop["lat"], prop["lon"]
+        bearing = calculate_initial_compass_bearing(
+            (latitude, longitude),
+            (lat, long),
+        )
+        return {
+            "id": prop["id_bollettino"],
+            "date": prop["data_bollettino"],
+            "id_event": id_event,
+            "event": p_event.capitalize(),
+            "value": p_id_phenom.get(id_event),
+            "latitude": lat,
+            "longitude": long,
+            "distance": round(distance / 1000, 1),
+            "direction": bearing[0],
+            "degrees": bearing[1],
+            "icon": PHENOMENA_ICON.get(id_event, DEFAULT_ICON),
+        }
+    return None
+
+
+def get_phenomena(
+    geojs: dict,
+    point: dict,
+    radius: float,
+    index: PhenomenaIndex | None = None,
+    limit: int = 0,
+    dedup: bool = False,
+) -> list:
+    """Return the phenomena within radius (Km) from point.
+
+    With limit only the nearest limit phenomena are kept, on a heap bounded by
+    limit during the scan, and with dedup only the nearest of each id_event.
+    Both return the phenomena sorted by distance, otherwise in bulletin order.
+    """
+    radius = radius * 1000
+    if index:
+        positions = index.within(point, radius)
+    else:
+        positions = (
+            position
+            for position, feature in enumerate(geojs["features"])
+            if geometry_within_radius(feature["geometry"], point, radius)
+        )
+    known = {
+        id_event for p_id_phenom in PHENOMENA_TYPE.values() for id_event in p_id_phenom
+    }
+    found = []  # (distance, position, prop) in bulletin order
+    heap = []  # (-distance, -position, prop) of the nearest, the farthest on top
+    nearest = {}  # id_event -> (distance, position, prop)
+    for position in positions:
+        prop = geojs["features"][position]["properties"]
+        id_event = prop["id_fenomeno"]
+        if id_event not in known:
+            continue
+        point2 = {"type": "Point", "coordinates": [prop["lon"], prop["lat"]]}
+        distance = point_distance(point, point2)
+        if dedup:
+            if id_event not in nearest or (distance, position) < nearest[id_event][:2]:
+                nearest[id_event] = (distance, position, prop)
+        elif not limit:
+            found.append((distance, position, prop))
+        elif len(heap) < limit:
+            heapq.heappush(heap, (-distance, -position, prop))
+        elif (-distance, -position) > heap[0][:2]:
+            heapq.heapreplace(heap, (-distance, -position, prop))
+    if dedup:
+        # At most one phenomenon per type is kept, so limit only cuts the list
+        found = sorted(nearest.values(), key=lambda item: item[:2])[: limit or None]
+    elif limit:
+        found = [(-distance, -position, prop) for distance, position, prop in heap]
+        found.sort(key=lambda item: item[:2])
+    return [_parse_phenomenon(point, prop, distance) for distance, _, prop in found]
+
+
+def parse_criticality(
+    prop: dict,
+    id_crit: str,
+    pub_date: datetime,
+    day_en: str,
+    day_it: str,
+    image: str,
+    expiration_date: datetime,
+) -> dict:
+    """Return the criticality data of a zone for a day of the bulletin."""
+    criticality = {
+        ATTR_ID: id_crit,
+        ATTR_LINK: CRIT_BULLETIN_URL,
+        ATTR_PUBLICATION_DATE: pub_date,
+        ATTR_ZONE_NAME: prop.get(ATTR_ZONE_NAME, prop["Nome zona"]),
+    }
+
+    criticality[day_en] = get_info_level(prop["Rappresentata nella mappa"])
+    criticality[day_en].update(
+        {
+            ATTR_IMAGE_URL: image,
+            ATTR_EXPIRES: expiration_date,
+            ATTR_ZONE_NAME: prop["Nome zona"],
+        }
+    )
+
+    for risk in RISKS:
+        criticality[f"{risk}_{day_it}"] = {
+            ATTR_RISK: risk.capitalize(),
+            ATTR_IMAGE_URL: image,
+            ATTR_EXPIRES: expiration_date,
+            "icon": CRIT_ICON.get(risk),
+            ATTR_ZONE_NAME: prop["Nome zona"],
+        }
+        criticality[f"{risk}_{day_it}"].update(
+            get_info_level(prop["Per rischio " + risk])
+        )
+    return criticality
+
+
+def parse_vigilance(prop: dict, id_vigi: str, pub_date: datetime, image: str) -> tuple:
+    """Return the vigilance data of a zone and the data of the day of the bulletin."""
+    vigilance = {
+        ATTR_ID: id_vigi,
+        ATTR_LINK: VIGI_BULLETIN_URL,
+        ATTR_PUBLICATION_DATE: pub_date,
+        ATTR_ZONE_NAME: prop.get(ATTR_ZONE_NAME, prop["Nome_Zona"]),
+    }
+    day = {
+        "icon": VIGI_ICON.get(prop["id_classificazione"]),
+        ATTR_IMAGE_URL: image,
+        ATTR_LEVEL: prop["id_classificazione"],
+        ATTR_PRECIPITATION: prop["Quantitativi_previsti"],
+        ATTR_ZONE_NAME: prop["Nome_Zona"],
+    }
+    return vigilance, day
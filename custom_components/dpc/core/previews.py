@@ -0,0 +1,95 @@
+"""Cache on disk of the preview images of the DPC bulletins."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from .const import CRIT_IMAGE_URL, LOGGER, VIGI_IMAGE_URL
+
+PREVIEW_DIR = "dpc_previews"
+PREVIEW_FILES = 32  # About a week of bulletins
+REGEX_PREVIEW = re.compile(r"^([0-9]{8}(?:_[0-9]{4})?)_(oggi|domani)\.png$")
+
+
+def preview_url(name: str) -> str | None:
+    """Return the url of a preview file name, None if it is not a preview."""
+    if not (match := REGEX_PREVIEW.match(name)):
+        return None
+    bulletin_id, day = match.groups()
+    pattern = CRIT_IMAGE_URL if "_" in bulletin_id else VIGI_IMAGE_URL
+    return pattern.format(bulletin_id, day)
+
+
+class PreviewCache:
+    """Preview images on disk, downloaded once per file name.
+
+    The file names of the previews hold the bulletin id, so a cached file
+    never changes. Only the max_files used last are kept. Concurrent requests
+    of a file not cached yet share one download.
+    """
+
+    def __init__(self, directory: str, max_files: int = PREVIEW_FILES) -> None:
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._pending = {}  # Name -> task downloading it
+
+    def _read(self, name: str) -> bytes | None:
+        path = self.directory / name
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # Used last, for the eviction
+        return data
+
+    def _write(self, name: str, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / name
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        files = sorted(
+            self.directory.glob("*.png"), key=lambda file: file.stat().st_mtime
+        )
+        for file in files[: max(0, len(files) - self.max_files)]:
+            file.unlink(missing_ok=True)
+            LOGGER.debug("Evicted the preview %s", file.name)
+
+    async def get(
+        self, name: str, fetch: Callable[[str], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        """Return a preview, downloading it with fetch(url) if not cached."""
+        url = preview_url(name)
+        if url is None:
+            return None
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, self._read, name)
+        if data is not None:
+            return data
+        if name not in self._pending:
+            self._pending[name] = asyncio.ensure_future(
+                self._download(name, url, fetch)
+            )
+        return await asyncio.shield(self._pending[name])
+
+    async def _download(
+        self, name: str, url: str, fetch: Callable[[str], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        data = None
+        try:
+            data = await fetch(url)
+            if data:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._write, name, data
+                )
+                LOGGER.debug("Cached the preview %s (%s bytes)", name, len(data))
+            return data
+        except OSError as e:
+            LOGGER.warning("Error caching the preview %s - %s", name, e)
+            return data
+        finally:
+            self._pending.pop(name, None)
@@ -0,0 +1,34 @@
+"""HTTP session tuned for the DPC endpoints."""
+
+from __future__ import annotations
+
+import ssl as ssl_module
+
+import aiohttp
+
+DPC_CONNECTIONS = 16
+DPC_CONNECTIONS_PER_HOST = 8  # The GeoJSON of a refresh: 2 criticality, 6 vigilance
+DPC_DNS_TTL = 300  # seconds, the hosts are always the same few
+DPC_KEEPALIVE = 60  # seconds, from the ids to the last GeoJSON of a refresh
+
+
+def create_session(
+    ssl: ssl_module.SSLContext | bool = True,
+    enable_cleanup_closed: bool = False,
+    headers: dict | None = None,
+) -> aiohttp.ClientSession:
+    """Return a session for the DPC endpoints, to be closed by the caller.
+
+    The connections are kept alive across the fetches of a refresh and the
+    DNS answers for DPC_DNS_TTL, so the GeoJSON of multi_fetch reuse the warm
+    connections of the ids. aiohttp asks for gzip, and brotli when installed.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=DPC_CONNECTIONS,
+        limit_per_host=DPC_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=DPC_DNS_TTL,
+        keepalive_timeout=DPC_KEEPALIVE,
+        enable_cleanup_closed=enable_cleanup_closed,
+        ssl=ssl,
+    )
+    return aiohttp.ClientSession(connector=connector, headers=headers)
@@ -0,0 +1,121 @@
+"""Streaming decoding of a FeatureCollection, keeping only the geometries needed.
+
+The features are split on the bytes of the document, tracking only its
+strings and braces, and decoded one at a time: a geometry not kept is
+dropped as soon as its bounding box is known, so the memory held is about
+one geometry, not the whole collection. The properties of every feature are
+always kept: they are small, and keep the positions of the features, the
+municipalities and the archive the same of the whole document.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Callable
+from itertools import chain
+from operator import itemgetter
+
+from .jsondecode import loads
+
+# Nesting of the positions in the coordinates, by geometry type
+POSITION_DEPTH = {
+    "Point": 0,
+    "MultiPoint": 1,
+    "LineString": 1,
+    "MultiLineString": 2,
+    "Polygon": 2,
+    "MultiPolygon": 3,
+}
+REGEX_FEATURES = re.compile(rb'"features"\s*:\s*\[')
+REGEX_KEY = re.compile(rb"\s*:\s*")
+REGEX_NEXT = re.compile(rb"\s*([,\]])")
+REGEX_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]')
+
+
+def geometry_bbox(geometry: dict) -> list | None:
+    """Return the [minlat, minlon, maxlat, maxlon] of a geometry, None if unknown."""
+    depth = POSITION_DEPTH.get(geometry.get("type"))
+    if depth is None:
+        return None
+    positions = geometry["coordinates"]
+    if depth == 0:
+        positions = [positions]
+    for _ in range(depth - 1):
+        positions = chain.from_iterable(positions)
+    positions = list(positions)
+    if not positions:
+        return [math.inf, math.inf, -math.inf, -math.inf]
+    lons = list(map(itemgetter(0), positions))
+    lats = list(map(itemgetter(1), positions))
+    return [min(lats), min(lons), max(lats), max(lons)]
+
+
+def _split_feature(data: bytes, start: int) -> tuple[int, int, int]:
+    """Return the end of the feature at start and the bounds of its geometry.
+
+    The bounds are (-1, -1) without a geometry.
+    """
+    depth = 0
+    geometry_start = geometry_end = -1
+    position = start
+    while match := REGEX_TOKEN.search(data, position):
+        token = match.group()
+        position = match.end()
+        if token == b"{":
+            depth += 1
+        elif token == b"}":
+            depth -= 1
+            if depth == 1 and geometry_start >= 0 > geometry_end:
+                geometry_end = position
+            elif depth == 0:
+                return position, geometry_start, geometry_end
+        elif depth == 1 and token == b'"geometry"':
+            key = REGEX_KEY.match(data, position)
+            if key is None:
+                continue
+            if data.startswith(b"null", key.end()):
+                geometry_start, geometry_end = key.end(), key.end() + 4
+            elif data.startswith(b"{", key.end()):
+                geometry_start = key.end()
+                # Skip the coordinates: only a GeometryCollection nests braces
+                end = data.find(b"}", geometry_start)
+                if end >= 0 and data.find(b"{", geometry_start + 1, end) < 0:
+                    geometry_end = position = end + 1
+    raise ValueError(f"Unterminated feature at {start}")
+
+
+def load_features(data: bytes, keep: Callable[[dict, str, list], bool]) -> dict:
+    """Return the FeatureCollection in data, with only the geometries kept.
+
+    keep(feature, geometry type, bbox) is called for every feature with its
+    properties, the bbox None for the unknown geometry types; the geometry of
+    the features not kept is None. Raise ValueError on a malformed document.
+    """
+    match = REGEX_FEATURES.search(data)
+    if match is None:
+        return loads(data)
+    features = []
+    position = match.end()
+    while True:
+        after = REGEX_NEXT.match(data, position)
+        if after is not None and after.group(1) == b"]":
+            break
+        start = after.end() if after is not None else position
+        end, geometry_start, geometry_end = _split_feature(data, start)
+        if geometry_start < 0:
+            feature = loads(data[start:end])
+        else:
+            feature = loads(
+                data[start:geometry_start] + b"null" + data[geometry_end:end]
+            )
+            geometry = loads(data[geometry_start:geometry_end])
+            if geometry is not None and keep(
+                feature, geometry.get("type"), geometry_bbox(geometry)
+            ):
+                feature["geometry"] = geometry
+        features.append(feature)
+        position = end
+    geojs = loads(data[: match.end()] + data[after.start(1) :])
+    geojs["features"] = features
+    return geojs
@@ -12,11 +12,13 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
 
-from .const import CONF_MUNICIPALITY, DOMAIN
+from .const import CONF_GITHUB_TOKEN, CONF_MIRRORS, CONF_MUNICIPALITY, DOMAIN
 
 TO_REDACT = {
     CONF_LATITUDE,
     CONF_LONGITUDE,
+    CONF_GITHUB_TOKEN,
+    CONF_MIRRORS,
     CONF_MUNICIPALITY,
     "identifiers",
     "unique_id",
@@ -62,6 +64,9 @@ async def async_get_config_entry_diagnostics(
         "coordinator_data": {
             "coordinator last update success": coordinator.last_update_success,
             "data": coordinator.data,
+            "mirrors": coordinator.api.endpoints.status(),
+            "latency_p95_ms": coordinator.api.latency.status(),
+            "github": coordinator.api.github.status(),
         },
         "devices": async_redact_data(devices, TO_REDACT),
     }
@@ -0,0 +1,133 @@
+"""Image platform for Dpc, the preview maps of the bulletins."""
+
+from __future__ import annotations
+
+from homeassistant.components.image import ImageEntity
+from homeassistant.const import (
+    ATTR_ICON,
+    ATTR_NAME,
+    CONF_LATITUDE,
+    CONF_LONGITUDE,
+    CONF_NAME,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from . import DpcDataUpdateCoordinator
+from .const import (
+    ATTR_IMAGE_URL,
+    ATTR_TODAY,
+    ATTR_TOMORROW,
+    CRITICALITY,
+    DEFAULT_NAME,
+    DOMAIN,
+    VIGILANCE,
+)
+from .core.previews import PreviewCache
+from .entity import DpcEntity
+from .views import get_previews
+
+ATTR_BULLETIN = "bulletin"
+ATTR_DAY = "day"
+
+IMAGE_TYPES = [
+    {
+        ATTR_NAME: "Criticality Map Today",
+        ATTR_BULLETIN: CRITICALITY,
+        ATTR_DAY: ATTR_TODAY,
+        ATTR_ICON: "mdi:map-marker-alert",
+    },
+    {
+        ATTR_NAME: "Criticality Map Tomorrow",
+        ATTR_BULLETIN: CRITICALITY,
+        ATTR_DAY: ATTR_TOMORROW,
+        ATTR_ICON: "mdi:map-marker-alert",
+    },
+    {
+        ATTR_NAME: "Vigilance Map Today",
+        ATTR_BULLETIN: VIGILANCE,
+        ATTR_DAY: ATTR_TODAY,
+        ATTR_ICON: "mdi:map-marker-radius",
+    },
+    {
+        ATTR_NAME: "Vigilance Map Tomorrow",
+        ATTR_BULLETIN: VIGILANCE,
+        ATTR_DAY: ATTR_TOMORROW,
+        ATTR_ICON: "mdi:map-marker-radius",
+    },
+]
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Setup image platform."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    previews = get_previews(hass)
+    async_add_entities(
+        DpcImage(hass, coordinator, entry, image_type, previews)
+        for image_type in IMAGE_TYPES
+    )
+
+
+class DpcImage(DpcEntity, ImageEntity):
+    """Dpc preview map of a bulletin, served from the local cache."""
+
+    _attr_content_type = "image/png"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: DpcDataUpdateCoordinator,
+        entry: str,
+        image_type: dict,
+        previews: PreviewCache,
+    ):
+        """Initialize Entities."""
+        DpcEntity.__init__(self, coordinator, entry)
+        ImageEntity.__init__(self, hass)
+        self.coordinator = coordinator
+        self._previews = previews
+        self._bulletin = image_type[ATTR_BULLETIN]
+        self._day = image_type[ATTR_DAY]
+        self._name = entry.data.get(CONF_NAME)
+        self._latitude = entry.data.get(CONF_LATITUDE)
+        self._longitude = entry.data.get(CONF_LONGITUDE)
+        self._attr_name = (
+            f"{entry.data.get(CONF_NAME, DEFAULT_NAME)} {image_type[ATTR_NAME]}"
+        )
+        self._attr_icon = image_type[ATTR_ICON]
+        self._url = self._preview_url()
+        self._attr_image_last_updated = dt_util.utcnow() if self._url else None
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return (
+            f"{self._name}_{self._bulletin}_{self._day}_map"
+            f"_{self._latitude}_{self._longitude}"
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True if the bulletin has a preview for the day."""
+        return bool(self.coordinator.last_update_success and self._url)
+
+    def _preview_url(self) -> str | None:
+        data = (self.coordinator.data or {}).get(self._bulletin) or {}
+        return (data.get(self._day) or {}).get(ATTR_IMAGE_URL)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """A new bulletin has a new preview: the clients load it again."""
+        url = self._preview_url()
+        if url != self._url:
+            self._url = url
+            self._attr_image_last_updated = dt_util.utcnow()
+        super()._handle_coordinator_update()
+
+    async def async_image(self) -> bytes | None:
+        """Return the preview of the bulletin, downloaded once in the cache."""
+        if not self._url:
+            return None
+        return await self._previews.get(
+            self._url.rsplit("/", 1)[-1], self.coordinator.api.api_fetch_bytes
+        )
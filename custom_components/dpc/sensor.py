@@ -1,6 +1,20 @@
 """Sensor platform for Dpc."""
 
-from homeassistant.const import ATTR_ICON, CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    ATTR_ICON,
+    ATTR_NAME,
+    CONF_LATITUDE,
+    CONF_LONGITUDE,
+    CONF_NAME,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
 
 from . import DpcDataUpdateCoordinator
 from .const import (
@@ -26,23 +40,101 @@ from .const import (
     DEFAULT_NAME,
     DEFAULT_WARNING_LEVEL,
     DOMAIN,
+    ENDPOINT_CRIT_GEOJSON,
+    ENDPOINT_CRIT_SITE,
+    ENDPOINT_VIGI_GEOJSON,
+    ENDPOINT_VIGI_SITE,
     LOGGER,
+    METRIC_BYTES,
+    METRIC_LATENCY,
+    METRIC_LOOP_TIME,
+    METRIC_REFRESH_DURATION,
+    METRIC_RETRIES,
     WARNING_TYPES,
 )
 from .entity import DpcEntity
 
 ICON = {"safety": "mdi:shield-check", "danger": "mdi:hazard-lights"}  # shield-account
 
+ATTR_METRIC = "metric"
+ATTR_ENDPOINT = "endpoint"
+ATTR_UNIT = "unit"
+ATTR_DEVICE_CLASS = "device_class"
+
+METRIC_SENSOR_TYPES = [
+    {
+        ATTR_NAME: "Refresh Duration",
+        ATTR_METRIC: METRIC_REFRESH_DURATION,
+        ATTR_ICON: "mdi:timer-outline",
+        ATTR_UNIT: UnitOfTime.MILLISECONDS,
+        ATTR_DEVICE_CLASS: SensorDeviceClass.DURATION,
+    },
+    {
+        ATTR_NAME: "Bytes Downloaded",
+        ATTR_METRIC: METRIC_BYTES,
+        ATTR_ICON: "mdi:download-network",
+        ATTR_UNIT: UnitOfInformation.BYTES,
+        ATTR_DEVICE_CLASS: SensorDeviceClass.DATA_SIZE,
+    },
+    {
+        ATTR_NAME: "Event Loop Time",
+        ATTR_METRIC: METRIC_LOOP_TIME,
+        ATTR_ICON: "mdi:cpu-64-bit",
+        ATTR_UNIT: UnitOfTime.MILLISECONDS,
+        ATTR_DEVICE_CLASS: SensorDeviceClass.DURATION,
+    },
+    {
+        ATTR_NAME: "Retries",
+        ATTR_METRIC: METRIC_RETRIES,
+        ATTR_ICON: "mdi:refresh",
+        ATTR_UNIT: None,
+        ATTR_DEVICE_CLASS: None,
+    },
+    {
+        ATTR_NAME: "Latency Criticality Site",
+        ATTR_METRIC: METRIC_LATENCY,
+        ATTR_ENDPOINT: ENDPOINT_CRIT_SITE,
+        ATTR_ICON: "mdi:timer-sand",
+        ATTR_UNIT: UnitOfTime.MILLISECONDS,
+        ATTR_DEVICE_CLASS: SensorDeviceClass.DURATION,
+    },
+    {
+        ATTR_NAME: "Latency Criticality GeoJSON",
+        ATTR_METRIC: METRIC_LATENCY,
+        ATTR_ENDPOINT: ENDPOINT_CRIT_GEOJSON,
+        ATTR_ICON: "mdi:timer-sand",
+        ATTR_UNIT: UnitOfTime.MILLISECONDS,
+        ATTR_DEVICE_CLASS: SensorDeviceClass.DURATION,
+    },
+    {
+        ATTR_NAME: "Latency Vigilance Site",
+        ATTR_METRIC: METRIC_LATENCY,
+        ATTR_ENDPOINT: ENDPOINT_VIGI_SITE,
+        ATTR_ICON: "mdi:timer-sand",
+        ATTR_UNIT: UnitOfTime.MILLISECONDS,
+        ATTR_DEVICE_CLASS: SensorDeviceClass.DURATION,
+    },
+    {
+        ATTR_NAME: "Latency Vigilance GeoJSON",
+        ATTR_METRIC: METRIC_LATENCY,
+        ATTR_ENDPOINT: ENDPOINT_VIGI_GEOJSON,
+        ATTR_ICON: "mdi:timer-sand",
+        ATTR_UNIT: UnitOfTime.MILLISECONDS,
+        ATTR_DEVICE_CLASS: SensorDeviceClass.DURATION,
+    },
+]
+
 
 async def async_setup_entry(hass, entry, async_add_entities):  # async_add_devices
     """Setup sensor platform."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities(
-        [
-            DpcSensorCriticality(coordinator, entry),
-            DpcSensorVigilance(coordinator, entry),
-        ]
-    )
+    sensors: list = [
+        DpcSensorCriticality(coordinator, entry),
+        DpcSensorVigilance(coordinator, entry),
+    ]
+    for sensor_type in METRIC_SENSOR_TYPES:
+        sensors.append(DpcSensorMetric(coordinator, entry, sensor_type))
+    async_add_entities(sensors)
 
 
 class DpcSensorCriticality(DpcEntity):
@@ -248,3 +340,50 @@ class DpcSensorVigilance(DpcEntity):
     # async def async_added_to_hass(self):
     #     """Subscribe to updates."""
     #     self.async_on_remove(self.coordinator.async_add_listener(self.async_write_ha_state))
+
+
+class DpcSensorMetric(DpcEntity, SensorEntity):
+    """Dpc diagnostic sensor class for the performance metrics."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator: DpcDataUpdateCoordinator,
+        entry: str,
+        sensor_type: dict,
+    ):
+        """Initialize Entities."""
+        super().__init__(coordinator, entry)
+        self.coordinator = coordinator
+        self.entry = entry
+        self._metric = sensor_type[ATTR_METRIC]
+        self._endpoint = sensor_type.get(ATTR_ENDPOINT)
+        self._kind = self._endpoint or self._metric
+        self._name = entry.data.get(CONF_NAME)
+        self._latitude = entry.data.get(CONF_LATITUDE)
+        self._longitude = entry.data.get(CONF_LONGITUDE)
+        self._attr_name = f"{entry.data.get(CONF_NAME, DEFAULT_NAME)} {sensor_type[ATTR_NAME]}"
+        self._attr_icon = sensor_type[ATTR_ICON]
+        self._attr_native_unit_of_measurement = sensor_type[ATTR_UNIT]
+        self._attr_device_class = sensor_type[ATTR_DEVICE_CLASS]
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return f"{self._name}_{self._kind}_{self._latitude}_{self._longitude}"
+
+    @property
+    def available(self) -> bool:
+        """Return True if the metric has been measured."""
+        return self.native_value is not None
+
+    @property
+    def native_value(self):
+        """Return the value of the metric."""
+        value = self.coordinator.metrics.get(self._metric)
+        if self._endpoint:
+            return value.get(self._endpoint)
+        return value
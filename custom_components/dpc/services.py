@@ -0,0 +1,167 @@
+"""Services of the DPC integration."""
+
+from __future__ import annotations
+
+import time
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE, CONF_RADIUS
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    ATTR_MUNICIPALITY_LEVELS,
+    ATTR_RISK,
+    CONF_MUNICIPALITY,
+    CRITICALITY,
+    DEFAULT_NAME,
+    DOMAIN,
+    LOGGER,
+    SERVICE_QUERY_HISTORY,
+    SERVICE_QUERY_POINT,
+    VIGILANCE,
+)
+from .core import Target
+
+QUERY_POINT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_LATITUDE): cv.latitude,
+        vol.Required(CONF_LONGITUDE): cv.longitude,
+        vol.Optional(CONF_MUNICIPALITY, default=""): cv.string,
+        vol.Optional(CONF_RADIUS): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+ATTR_END = "end"
+ATTR_HISTORY = "history"
+ATTR_START = "start"
+ATTR_ZONE = "zone"
+
+QUERY_HISTORY_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(ATTR_ZONE, "zone"): cv.string,
+            vol.Exclusive(CONF_MUNICIPALITY, "zone"): cv.string,
+            vol.Optional(ATTR_START): cv.date,
+            vol.Optional(ATTR_END): cv.date,
+            vol.Optional(ATTR_RISK, default=""): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ZONE, CONF_MUNICIPALITY),
+)
+
+
+def _get_coordinator(hass: HomeAssistant):
+    """Return the coordinator holding the most recent bulletins, with every border."""
+    coordinators = [
+        coordinator
+        for coordinator in hass.data.get(DOMAIN, {}).values()
+        if coordinator.last_update_success
+        and coordinator.data
+        and not coordinator.api.streamed
+    ]
+    if not coordinators:
+        raise HomeAssistantError(
+            "No DPC bulletin has been loaded yet, by an entry decoding all the zones"
+        )
+    return max(
+        coordinators,
+        key=lambda coordinator: (
+            coordinator.api._id_crit or "",
+            coordinator.api._id_vigi or "",
+        ),
+    )
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_query_point(call: ServiceCall) -> ServiceResponse:
+        """Resolve a point on the bulletins already loaded, without network calls."""
+        start = time.perf_counter()
+        coordinator = _get_coordinator(hass)
+        target = Target(
+            DEFAULT_NAME,
+            call.data[CONF_LATITUDE],
+            call.data[CONF_LONGITUDE],
+            call.data[CONF_MUNICIPALITY],
+            call.data.get(CONF_RADIUS),
+        )
+        if target.municipality and not coordinator.api.has_municipality(
+            target.municipality
+        ):
+            raise HomeAssistantError(
+                f"Municipality not found in the DPC bulletins: {target.municipality}"
+            )
+        data = (await coordinator.api.resolve_many([target]))[0]
+        LOGGER.debug(
+            "Query point %s, %s resolved in %.1f ms",
+            target.latitude,
+            target.longitude,
+            (time.perf_counter() - start) * 1000,
+        )
+        response = {
+            CONF_LATITUDE: target.latitude,
+            CONF_LONGITUDE: target.longitude,
+            CONF_MUNICIPALITY: target.municipality,
+            CRITICALITY: data[CRITICALITY],
+            VIGILANCE: data[VIGILANCE],
+        }
+        if target.municipality:
+            # Max levels of all the zones of the municipality, by bulletin file
+            response[ATTR_MUNICIPALITY_LEVELS] = coordinator.api.get_municipality(
+                target.municipality
+            )
+        return response
+
+    if not hass.services.has_service(DOMAIN, SERVICE_QUERY_POINT):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_QUERY_POINT,
+            async_query_point,
+            schema=QUERY_POINT_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+
+    async def async_query_history(call: ServiceCall) -> ServiceResponse:
+        """Return the archived levels of a zone or municipality, without network calls."""
+        archive = next(
+            (
+                coordinator.api._archive
+                for coordinator in hass.data.get(DOMAIN, {}).values()
+                if coordinator.api._archive is not None
+            ),
+            None,
+        )
+        if archive is None:
+            raise HomeAssistantError("The archive of the DPC bulletins is not enabled")
+        start = time.perf_counter()
+        history = await hass.async_add_executor_job(
+            archive.history,
+            call.data.get(ATTR_ZONE, ""),
+            call.data.get(CONF_MUNICIPALITY, ""),
+            call.data.get(ATTR_START),
+            call.data.get(ATTR_END),
+            call.data[ATTR_RISK],
+        )
+        LOGGER.debug(
+            "Query history of %s levels in %.1f ms",
+            len(history),
+            (time.perf_counter() - start) * 1000,
+        )
+        return {ATTR_HISTORY: history}
+
+    if not hass.services.has_service(DOMAIN, SERVICE_QUERY_HISTORY):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_QUERY_HISTORY,
+            async_query_history,
+            schema=QUERY_HISTORY_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
@@ -0,0 +1,126 @@
+"""HTTP views of the DPC integration."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from aiohttp import hdrs, web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    ATTR_AFTERTOMORROW,
+    ATTR_TODAY,
+    ATTR_TOMORROW,
+    CRITICALITY,
+    DATA_PREVIEWS,
+    DOMAIN,
+    VIGILANCE,
+)
+from .core.previews import PREVIEW_DIR, PreviewCache
+
+# The previews never change: their file names hold the id of the bulletin
+PREVIEW_CACHE_CONTROL = "private, max-age=604800, immutable"
+# The zones of a day change with a new bulletin: the clients revalidate the ETag
+ZONES_CACHE_CONTROL = "private, no-cache"
+ZONES_DAYS = {ATTR_TODAY: 0, ATTR_TOMORROW: 1, ATTR_AFTERTOMORROW: 2}
+
+
+def get_previews(hass: HomeAssistant) -> PreviewCache:
+    """Return the cache of the preview maps, shared by all the entries."""
+    if DATA_PREVIEWS not in hass.data:
+        hass.data[DATA_PREVIEWS] = PreviewCache(hass.config.path(PREVIEW_DIR))
+    return hass.data[DATA_PREVIEWS]
+
+
+class DpcPreviewView(HomeAssistantView):
+    """Serve the preview maps of the bulletins from the local cache."""
+
+    name = "api:dpc:preview"
+    url = "/api/dpc/preview/{name}"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+
+    async def get(self, request: web.Request, name: str) -> web.Response:
+        """Return a preview, downloading it the first time."""
+        etag = f'"{name}"'
+        if etag in request.headers.get(hdrs.IF_NONE_MATCH, ""):
+            return web.Response(
+                status=304,
+                headers={hdrs.ETAG: etag, hdrs.CACHE_CONTROL: PREVIEW_CACHE_CONTROL},
+            )
+        coordinators = list(self.hass.data.get(DOMAIN, {}).values())
+        if not coordinators:
+            raise web.HTTPNotFound()
+        data = await get_previews(self.hass).get(
+            name, coordinators[0].api.api_fetch_bytes
+        )
+        if data is None:
+            raise web.HTTPNotFound()
+        return web.Response(
+            body=data,
+            content_type="image/png",
+            headers={hdrs.ETAG: etag, hdrs.CACHE_CONTROL: PREVIEW_CACHE_CONTROL},
+        )
+
+
+class DpcZonesView(HomeAssistantView):
+    """Serve the zones of the location of an entry, from the loaded bulletin.
+
+    The response is a FeatureCollection of the zones the levels come from,
+    with their levels as properties. The query parameter tolerance (m)
+    simplifies the rings. The ETag is the bulletin id with the zones and the
+    tolerance, so a client downloads the zones once per bulletin.
+    """
+
+    name = "api:dpc:zones"
+    url = "/api/dpc/zones/{entry_id}/{bulletin}/{day}"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+
+    async def get(
+        self, request: web.Request, entry_id: str, bulletin: str, day: str
+    ) -> web.Response:
+        """Return the zones of the location for a bulletin and a day."""
+        coordinator = self.hass.data.get(DOMAIN, {}).get(entry_id)
+        if (
+            coordinator is None
+            or bulletin not in (CRITICALITY, VIGILANCE)
+            or day not in ZONES_DAYS
+        ):
+            raise web.HTTPNotFound()
+        try:
+            tolerance = float(request.query.get("tolerance", 0))
+        except ValueError:
+            tolerance = -1
+        if not 0 <= tolerance < float("inf"):
+            raise web.HTTPBadRequest(text="tolerance must be a number of metres")
+
+        day_date = date.today() + timedelta(days=ZONES_DAYS[day])
+        zones = coordinator.api.get_zones(bulletin, day_date)
+        if zones is None:
+            raise web.HTTPNotFound()
+        bulletin_id, index, positions = zones
+        etag = '"{}-{}-{}-{:g}"'.format(
+            bulletin_id, day_date.isoformat(), ".".join(map(str, positions)), tolerance
+        )
+        headers = {hdrs.ETAG: etag, hdrs.CACHE_CONTROL: ZONES_CACHE_CONTROL}
+        if etag in request.headers.get(hdrs.IF_NONE_MATCH, ""):
+            return web.Response(status=304, headers=headers)
+
+        def _features() -> list:
+            features = [index.feature(position, tolerance) for position in positions]
+            for feature in features:
+                feature["properties"].update(
+                    {"bulletin": bulletin_id, "date": day_date.isoformat()}
+                )
+            return features
+
+        features = await self.hass.async_add_executor_job(_features)
+        return self.json(
+            {"type": "FeatureCollection", "features": features}, headers=headers
+        )